@@ -3,7 +3,7 @@ Application-wide settings and constants.
 """
 import streamlit as st
 
-ALLOWED_SYMBOLS = [
+ALLOWED_SYMBOLS = (
     "AAPL", "TSLA", "AMZN", "MSFT", "NVDA", "GOOGL", "META", "NFLX", "JPM", "V", "BAC", "AMD", "PYPL",
     "DIS", "T", "PFE", "COST", "INTC", "KO", "TGT", "NKE", "SPY", "BA", "BABA", "XOM", "WMT", "GE", "CSCO",
     "VZ", "JNJ", "CVX", "PLTR", "SQ", "SHOP", "SBUX", "SOFI", "HOOD", "RBLX", "SNAP", "UBER", "FDX", "ABBV",
@@ -11,7 +11,15 @@ ALLOWED_SYMBOLS = [
     "MRO", "COIN", "SIRI", "RIOT", "CPRX", "VWO", "SPYG", "ROKU", "VIAC", "ATVI", "BIDU", "DOCU", "ZM", "PINS",
     "TLRY", "WBA", "MGM", "NIO", "C", "GS", "WFC", "ADBE", "PEP", "UNH", "CARR", "FUBO", "HCA", "TWTR", "BILI",
     "RKT"
-]
+)
+
+# Symbol -> position in ALLOWED_SYMBOLS, for O(1) dropdown defaults.
+SYMBOL_INDEX = {s: i for i, s in enumerate(ALLOWED_SYMBOLS)}
+
+# st.cache_data limits: entry lifetime (the API fetch cache's too), and how
+# many entries each page-level cache keeps.
+CACHE_TTL_SECONDS = 3600
+PAGE_CACHE_MAX_ENTRIES = 8
 
 def get_api_key():
     try:
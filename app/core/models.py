@@ -1,6 +1,6 @@
 from typing import Optional
 from typing import List
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, TypeAdapter
 from decimal import Decimal
 
 class Ratios(BaseModel):
@@ -121,11 +121,6 @@ class KeyMetrics(BaseModel):
     freeCashFlowToFirm: Decimal
     tangibleAssetValue: Decimal
     netCurrentAssetValue: Decimal
-     
-    def float_to_decimal(cls, v):
-        if isinstance(v, Decimal):
-            return Decimal(str(v))
-        return v
 
 
 class BalanceSheet(BaseModel):
@@ -196,11 +191,6 @@ class BalanceSheet(BaseModel):
     totalDebt: Decimal
     netDebt: Decimal
 
-    def float_to_decimal(cls, v):
-        if isinstance(v, Decimal):
-            return Decimal(str(v))
-        return v
-
 class IncomeStatement(BaseModel):
     date: str
     symbol: str
@@ -248,11 +238,6 @@ class IncomeStatement(BaseModel):
     weightedAverageShsOut: Decimal
     weightedAverageShsOutDil: Decimal
 
-    def float_to_decimal(cls, v):
-        if isinstance(v, Decimal):
-            return Decimal(str(v))
-        return v
-
 # For a list of objects
 IncomeStatementList = List[IncomeStatement]
 
@@ -316,10 +301,20 @@ class CashFlowStatement(BaseModel):
 
     incomeTaxesPaid: Decimal
     interestPaid: Decimal
-
-    def float_to_decimal(cls, v):
-        if isinstance(v, Decimal):
-            return Decimal(str(v))
-        return v
 # For a list of entries
 CashFlowStatementList = List[CashFlowStatement]
+
+# Bulk validators/serializers: a whole statement list in one pydantic-core call
+RatiosListAdapter = TypeAdapter(List[Ratios])
+KeyMetricsListAdapter = TypeAdapter(List[KeyMetrics])
+BalanceSheetListAdapter = TypeAdapter(List[BalanceSheet])
+IncomeStatementListAdapter = TypeAdapter(IncomeStatementList)
+CashFlowStatementListAdapter = TypeAdapter(CashFlowStatementList)
+
+LIST_ADAPTERS = {
+    Ratios: RatiosListAdapter,
+    KeyMetrics: KeyMetricsListAdapter,
+    BalanceSheet: BalanceSheetListAdapter,
+    IncomeStatement: IncomeStatementListAdapter,
+    CashFlowStatement: CashFlowStatementListAdapter,
+}
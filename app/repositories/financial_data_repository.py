@@ -1,7 +1,47 @@
+import time
+import zlib
 import boto3
 import requests
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
 from datetime import datetime, timedelta
-from typing import List, Type, Optional, Any
+from functools import lru_cache
+from typing import List, Tuple, Type, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import TypeAdapter
+from app.core.models import LIST_ADAPTERS
+
+
+# Bumped whenever the layout of the cached "data" attribute changes.
+CACHE_SCHEMA_VERSION = 2
+
+# Enough keep-alive connections for every statement endpoint fetched at once.
+HTTP_POOL_SIZE = 8
+
+# BatchGetItem retries for throttled (unprocessed) keys: exponential backoff
+# from the base delay, giving up after the last attempt.
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BASE_DELAY = 0.05
+
+
+# Plain dict <-> DynamoDB attribute-value conversion for the low-level client.
+_SERIALIZER = TypeSerializer()
+_DESERIALIZER = TypeDeserializer()
+
+
+def _to_attributes(item: dict) -> dict:
+    """Serialize a plain item into DynamoDB attribute values."""
+    return {k: _SERIALIZER.serialize(v) for k, v in item.items()}
+
+
+def _from_attributes(item: dict) -> dict:
+    """Deserialize DynamoDB attribute values into a plain item."""
+    return {k: _DESERIALIZER.deserialize(v) for k, v in item.items()}
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[Any]) -> TypeAdapter:
+    """The shared List[model] adapter for statement models; built once for any other model."""
+    return LIST_ADAPTERS.get(model) or TypeAdapter(List[model])
 
 
 class FinancialDataRepository:
@@ -20,19 +60,41 @@ class FinancialDataRepository:
         max_cache_age_hours: int = 24,
         aws_region: str = "us-east-1",
     ):
-        self.dynamodb = boto3.resource("dynamodb", region_name=aws_region)
-        self.table = self.dynamodb.Table(table_name)
+        # One boto3 session (credentials resolved once) and one pooled HTTP
+        # session, shared by the concurrent loads in the service layer. Cache
+        # reads and writes go through the low-level client: unlike boto3
+        # resources, clients are thread-safe.
+        self.boto_session = boto3.session.Session(region_name=aws_region)
+        self.dynamodb = self.boto_session.client("dynamodb")
+        self.http = requests.Session()
+        self.http.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.table_name = table_name
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
-        self.max_age = timedelta(hours=max_cache_age_hours)
+        self.max_age_seconds = max_cache_age_hours * 3600
 
     # -------------------------------------------------------
     # Internal Helpers
     # -------------------------------------------------------
-    def _is_fresh(self, updated_at: str) -> bool:
-        """Return True if data is newer than the allowed max cache age."""
-        updated = datetime.fromisoformat(updated_at)
-        return (datetime.utcnow() - updated) < self.max_age
+    def _is_fresh(self, item: dict) -> bool:
+        """
+        Return True if data is newer than the allowed max cache age. Items
+        written under another cache schema count as stale.
+        """
+        if item.get("schema_version") != CACHE_SCHEMA_VERSION:
+            return False
+        epoch = item.get("updated_at_epoch")
+        return epoch is not None and time.time() - int(epoch) < self.max_age_seconds
+
+    @staticmethod
+    def _encode(model: Type[Any], records: List[Any]) -> Binary:
+        """Serialize records into one compressed JSON blob."""
+        return Binary(zlib.compress(_list_adapter(model).dump_json(records)))
+
+    @staticmethod
+    def _decode(model: Type[Any], data: Binary) -> List[Any]:
+        """Rebuild models from the cached compressed blob."""
+        return _list_adapter(model).validate_json(zlib.decompress(data.value))
 
     def _build_url(self, endpoint: str, symbol: str, extra: str = "") -> str:
         """Create full API endpoint URL."""
@@ -68,49 +130,122 @@ class FinancialDataRepository:
         # --------------------------
         # 1. Try DynamoDB cache
         # --------------------------
-        response = self.table.get_item(
-            Key={
+        response = self.dynamodb.get_item(
+            TableName=self.table_name,
+            Key=_to_attributes({
                 "symbol": symbol,      # PK
                 "dataset": endpoint,   # SK
-            }
+            }),
         )
 
         item = response.get("Item")
+        item = _from_attributes(item) if item else None
 
-        if item and self._is_fresh(item["updated_at"]):
+        if item and self._is_fresh(item):
             print(f"[CACHE HIT] {symbol}/{endpoint}")
 
-            return [model(**entry) for entry in item["data"]]
+            return self._decode(model, item["data"])
+
+        return self._fetch_and_store(symbol, endpoint, model, extra_params, ttl_days)
 
+    def load_many(
+        self,
+        symbol: str,
+        specs: List[Tuple[str, Type[Any]]],
+        limit: Optional[int] = None,
+        ttl_days: int = 3,
+    ) -> List[List[Any]]:
+        """
+        Load several datasets for a symbol:
+        - Read all cache entries with one DynamoDB BatchGetItem
+        - Fetch stale or missing datasets from the API concurrently
+        - Return one list of model instances per spec, in spec order
+        """
+        extra_params = f"&limit={limit}" if limit else ""
+
+        # --------------------------
+        # 1. One batch read for every dataset
+        # --------------------------
+        keys = [_to_attributes({"symbol": symbol, "dataset": endpoint}) for endpoint, _ in specs]
+        items = {}
+        request = {self.table_name: {"Keys": keys}}
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_GET_BASE_DELAY * 2 ** (attempt - 1))
+            response = self.dynamodb.batch_get_item(RequestItems=request)
+            for raw in response.get("Responses", {}).get(self.table_name, []):
+                item = _from_attributes(raw)
+                items[item["dataset"]] = item
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+        # Keys still unprocessed after the last attempt are treated as misses
+
+        results: List[Optional[List[Any]]] = [None] * len(specs)
+        stale = []
+        for i, (endpoint, model) in enumerate(specs):
+            item = items.get(endpoint)
+            if item and self._is_fresh(item):
+                print(f"[CACHE HIT] {symbol}/{endpoint}")
+                results[i] = self._decode(model, item["data"])
+            else:
+                stale.append(i)
+
+        # --------------------------
+        # 2. Refresh the rest in parallel
+        # --------------------------
+        if stale:
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                futures = {
+                    i: executor.submit(self._fetch_and_store, symbol, specs[i][0], specs[i][1], extra_params, ttl_days)
+                    for i in stale
+                }
+                for i, future in futures.items():
+                    results[i] = future.result()
+
+        return results
+
+    def _fetch_and_store(
+        self,
+        symbol: str,
+        endpoint: str,
+        model: Type[Any],
+        extra_params: str,
+        ttl_days: int,
+    ) -> List[Any]:
+        """Fetch a dataset from the API, validate it and write it to the cache."""
         print(f"[CACHE MISS] Fetching {symbol}/{endpoint} from FMP API…")
 
         # --------------------------
-        # 2. Call external API
+        # 1. Call external API
         # --------------------------
         url = self._build_url(endpoint, symbol, extra_params)
-        r = requests.get(url, timeout=10)
+        r = self.http.get(url, timeout=10)
         r.raise_for_status()
-        json_data = r.json()
 
         # --------------------------
-        # 3. Convert to Pydantic models
+        # 2. Parse + validate the raw body in one pydantic-core pass
         # --------------------------
-        records = [model(**row) for row in json_data]
+        records = _list_adapter(model).validate_json(r.content)
         print(f"[RECORDS] Returned from FMP API…")
 
         # --------------------------
-        # 4. Store in DynamoDB
+        # 3. Store in DynamoDB
         # --------------------------
-        ttl_value = int((datetime.utcnow() + timedelta(days=ttl_days)).timestamp())
+        now = datetime.utcnow()
+        ttl_value = int((now + timedelta(days=ttl_days)).timestamp())
 
-        self.table.put_item(
-            Item={
+        self.dynamodb.put_item(
+            TableName=self.table_name,
+            Item=_to_attributes({
                 "symbol": symbol,
                 "dataset": endpoint,
-                "updated_at": datetime.utcnow().isoformat(),
-                "data": [rec.dict() for rec in records],
+                "updated_at": now.isoformat(),
+                "updated_at_epoch": int(time.time()),
+                "data": self._encode(model, records),
+                "schema_version": CACHE_SCHEMA_VERSION,
                 "ttl": ttl_value,
-            }
+            }),
         )
 
         return records
@@ -6,12 +6,115 @@ and preparing financial data for the UI layer.
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Tuple
-import json
-from pydantic import ValidationError
+from operator import attrgetter
+from typing_extensions import TypedDict
+import orjson
+from pydantic import TypeAdapter, ValidationError
 from app.repositories.financial_data_repository import FinancialDataRepository
-from app.core.models import BalanceSheet, IncomeStatement, CashFlowStatement, KeyMetrics, Ratios
+from app.core.models import (
+    BalanceSheet, IncomeStatement, CashFlowStatement, KeyMetrics, Ratios,
+    BalanceSheetListAdapter, IncomeStatementListAdapter, CashFlowStatementListAdapter,
+    KeyMetricsListAdapter, RatiosListAdapter,
+)
 from decimal import Decimal
 
+class _MockPayload(TypedDict):
+    """Layout of the bundled mock-data JSON file."""
+    balance_sheet: List[BalanceSheet]
+    income_statement: List[IncomeStatement]
+    cashflow_statement: List[CashFlowStatement]
+    metrics: List[KeyMetrics]
+    financial_metrics: List[Ratios]
+
+
+_MOCK_PAYLOAD_ADAPTER = TypeAdapter(_MockPayload)
+
+# Field order per model and a C-level row getter for it, resolved once at import.
+_BS_FIELDS = tuple(BalanceSheet.model_fields)
+_IS_FIELDS = tuple(IncomeStatement.model_fields)
+_CF_FIELDS = tuple(CashFlowStatement.model_fields)
+_KM_FIELDS = tuple(KeyMetrics.model_fields)
+_RATIOS_FIELDS = tuple(Ratios.model_fields)
+_BS_GETTER = attrgetter(*_BS_FIELDS)
+_IS_GETTER = attrgetter(*_IS_FIELDS)
+_CF_GETTER = attrgetter(*_CF_FIELDS)
+_KM_GETTER = attrgetter(*_KM_FIELDS)
+_RATIOS_GETTER = attrgetter(*_RATIOS_FIELDS)
+
+
+def _decimal_fields(model) -> Tuple[str, ...]:
+    """Names of the Decimal (or Optional[Decimal]) fields of a model."""
+    return tuple(
+        name for name, field in model.model_fields.items()
+        if field.annotation is Decimal or Decimal in getattr(field.annotation, "__args__", ())
+    )
+
+
+# Models keep Decimal for exactness at the edge; DataFrames hold these as float64.
+_BS_NUMERIC = _decimal_fields(BalanceSheet)
+_IS_NUMERIC = _decimal_fields(IncomeStatement)
+_CF_NUMERIC = _decimal_fields(CashFlowStatement)
+_KM_NUMERIC = _decimal_fields(KeyMetrics)
+_RATIOS_NUMERIC = _decimal_fields(Ratios)
+
+# Normalized (lowercase, no spaces) column names accepted as the fiscal year, in priority order;
+# a column is only used if it holds numeric years.
+_FISCAL_YEAR_KEYS = ('fiscalyear', 'fiscal_year', 'year', 'fy', 'period')
+
+# Statement columns consumed by _metrics_kernel, in argument order.
+_KERNEL_INPUTS = (
+    'shortTermDebt', 'longTermDebt', 'cashAndCashEquivalents', 'commonStockRepurchased',
+    'commonDividendsPaid', 'grossProfit', 'operatingIncome', 'netIncome', 'revenue',
+    'operatingCashFlow', 'freeCashFlow', 'capitalExpenditure', 'totalAssets',
+    'totalLiabilities', 'totalStockholdersEquity',
+)
+
+
+def _nz(a: np.ndarray) -> np.ndarray:
+    """Missing values as 0 (works for float and object/Decimal arrays)."""
+    return np.where(pd.isna(a), 0, a)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, NaN where den is 0 (so Decimal arrays never raise DivisionByZero)."""
+    out = np.full(len(den), np.nan, dtype=np.result_type(num, den, np.float64))
+    return np.divide(num, den, out=out, where=(den != 0).astype(bool))
+
+
+def _metrics_kernel(short_debt, long_debt, cash, repurchased, dividends_paid, gross, op_income,
+                    net_income, revenue, ocf, fcf, capex, total_assets, total_liabilities, equity) -> Dict[str, np.ndarray]:
+    """
+    Element-wise derived metrics over aligned 1-D arrays, one entry per fiscal
+    year. Runs as plain NumPy ufuncs on float64 input, with no index
+    alignment; object (Decimal) arrays keep exact Decimal arithmetic. Ratios
+    with a zero denominator are NaN.
+    """
+    debt = _nz(short_debt) + _nz(long_debt)
+    buybacks = -_nz(repurchased)
+    dividends = -_nz(dividends_paid)
+    # Growth against the previous row (rows are in ascending fiscalYear order)
+    rev_yoy = np.empty(len(revenue), dtype=np.result_type(revenue.dtype, np.float64))
+    rev_yoy[:1] = np.nan
+    rev_yoy[1:] = _ratio(revenue[1:], revenue[:-1]) - 1
+    return {
+        'netDebt': debt - _nz(cash),
+        'buybacks': buybacks,
+        'dividends': dividends,
+        'grossMargin': _ratio(gross, revenue),
+        'opMargin': _ratio(op_income, revenue),
+        'netMargin': _ratio(net_income, revenue),
+        'OCF_to_NetIncome': _ratio(ocf, net_income),
+        'FCF_to_NetIncome': _ratio(fcf, net_income),
+        'capex_to_revenue': _ratio(capex, revenue),
+        'buyback_pct_of_FCF': _ratio(buybacks, fcf),
+        'dividend_pct_of_FCF': _ratio(dividends, fcf),
+        'payout_pct_of_FCF': _ratio(buybacks + dividends, fcf),
+        'current_ratio': _ratio(total_assets, total_liabilities),
+        'debt_to_equity': _ratio(debt, equity),
+        'rev_yoy': rev_yoy,
+    }
+
+
 class FinancialDataService:
     def __init__(self, repository: FinancialDataRepository):
         self.repository = repository
@@ -20,120 +123,155 @@ class FinancialDataService:
         """
         Fetches all financial statements for a given symbol.
         """
-        bs = self.repository.load(symbol, "balance-sheet-statement", BalanceSheet, limit)
-        is_ = self.repository.load(symbol, "income-statement", IncomeStatement, limit)
-        cf = self.repository.load(symbol, "cash-flow-statement", CashFlowStatement, limit)
-        metrics = self.repository.load(symbol, "key-metrics", KeyMetrics, limit)
-        financial = self.repository.load(symbol, "ratios", Ratios, limit)
+        datasets = (
+            ("balance-sheet-statement", BalanceSheet),
+            ("income-statement", IncomeStatement),
+            ("cash-flow-statement", CashFlowStatement),
+            ("key-metrics", KeyMetrics),
+            ("ratios", Ratios),
+        )
+        # One batched cache read; stale endpoints are refetched concurrently.
+        bs, is_, cf, metrics, financial = self.repository.load_many(symbol, list(datasets), limit)
         return bs, is_, cf, metrics, financial
 
     def convert_to_dataframes(self, bs_models: List[BalanceSheet], is_models: List[IncomeStatement], cf_models: List[CashFlowStatement], key_metrics_models: List[KeyMetrics], financeial_metrics_models: List[Ratios]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """
         Converts lists of Pydantic models to pandas DataFrames.
         """
-        df_bs = pd.DataFrame([m.dict() for m in bs_models])
-        df_is = pd.DataFrame([m.dict() for m in is_models])
-        df_cf = pd.DataFrame([m.dict() for m in cf_models])
-        df_km = pd.DataFrame([m.dict() for m in key_metrics_models])
-        df_fm = pd.DataFrame([m.dict() for m in financeial_metrics_models])
+        df_bs = self._to_frame(bs_models, _BS_FIELDS, _BS_GETTER, _BS_NUMERIC)
+        df_is = self._to_frame(is_models, _IS_FIELDS, _IS_GETTER, _IS_NUMERIC)
+        df_cf = self._to_frame(cf_models, _CF_FIELDS, _CF_GETTER, _CF_NUMERIC)
+        df_km = self._to_frame(key_metrics_models, _KM_FIELDS, _KM_GETTER, _KM_NUMERIC)
+        df_fm = self._to_frame(financeial_metrics_models, _RATIOS_FIELDS, _RATIOS_GETTER, _RATIOS_NUMERIC)
+
+        # Parse dates and sort oldest-first once here so pages can use the
+        # frames as-is and read the latest period with iloc[-1]
+        frames = []
+        for df in (df_bs, df_is, df_cf, df_km, df_fm):
+            df["date"] = self._parse_dates(df["date"])
+            df = df.sort_values("date", kind="mergesort").reset_index(drop=True)
+            df.attrs["sorted_by"] = "date"
+            frames.append(df)
 
-        df_bs = df_bs.sort_values("date", ascending=False)
-        df_is = df_is.sort_values("date", ascending=False)
-        df_cf = df_cf.sort_values("date", ascending=False)
-        df_km = df_km.sort_values("date", ascending=False)
-        df_fm = df_fm.sort_values("date", ascending=False)
+        return tuple(frames)
 
-        return df_bs, df_is, df_cf, df_km, df_fm
+    @staticmethod
+    def _to_frame(models: list, fields: Tuple[str, ...], getter: attrgetter, numeric: Tuple[str, ...]) -> pd.DataFrame:
+        """
+        Builds a DataFrame from row tuples of model attributes, skipping the
+        per-model dict dump. Decimal fields become float64 columns and
+        fiscalYear an integer column.
+        """
+        df = pd.DataFrame.from_records([getter(m) for m in models], columns=fields, coerce_float=True)
+        # coerce_float turns Decimal columns into consolidated float64 blocks; cast
+        # only the stragglers (e.g. all-None columns) so blocks aren't split per column
+        stragglers = {c: "float64" for c in numeric if df[c].dtype != "float64"}
+        if stragglers:
+            df = df.astype(stragglers)
+        # Statement models carry fiscalYear as str; store it as an integer column
+        if "fiscalYear" in df.columns and not pd.api.types.is_integer_dtype(df["fiscalYear"]):
+            df["fiscalYear"] = pd.to_numeric(df["fiscalYear"], errors="coerce").astype("Int64")
+        return df
 
     def load_mock_data(self, json_path: str) -> Tuple[List[BalanceSheet], List[IncomeStatement], List[CashFlowStatement], List[KeyMetrics]]:
         """
         Loads mock data from a JSON file.
         """
-        with open(json_path, "r") as f:
-            raw = json.load(f)
-
-        # Parse balance sheet
-        bs_models = []
-        for entry in raw["balance_sheet"]:
-            try:
-                bs_models.append(BalanceSheet(**entry))
-            except ValidationError as e:
-                print("❌ BalanceSheet validation error:", e)
-
-        # Parse income statement
-        is_models = []
-        for entry in raw["income_statement"]:
-            try:
-                is_models.append(IncomeStatement(**entry))
-            except ValidationError as e:
-                print("❌ IncomeStatement validation error:", e)
-
-        # Parse cash flow statement
-        cf_models = []
-        for entry in raw["cashflow_statement"]:
-            try:
-                cf_models.append(CashFlowStatement(**entry))
-            except ValidationError as e:
-                print("❌ CashFlow validation error:", e)
-
-        # Parse cash flow statement
-        metrics_models = []
-        for entry in raw["metrics"]:
-            try:
-                metrics_models.append(KeyMetrics(**entry))
-            except ValidationError as e:
-                print("❌ CashFlow validation error:", e)
-
-        # Parse cash flow statement
-        financials_models = []
-        for entry in raw["financial_metrics"]:
-            try:
-                financials_models.append(Ratios(**entry))
-            except ValidationError as e:
-                print("❌ CashFlow validation error:", e)
+        with open(json_path, "rb") as f:
+            payload = f.read()
+
+        # Fast path: parse and validate the whole file in one pydantic-core pass
+        try:
+            data = _MOCK_PAYLOAD_ADAPTER.validate_json(payload)
+            return (data["balance_sheet"], data["income_statement"], data["cashflow_statement"],
+                    data["metrics"], data["financial_metrics"])
+        except ValidationError:
+            pass
+
+        # Slow path: validate section by section, dropping the bad rows
+        raw = orjson.loads(payload)
+        bs_models = self._validate_entries(BalanceSheetListAdapter, raw["balance_sheet"], "BalanceSheet")
+        is_models = self._validate_entries(IncomeStatementListAdapter, raw["income_statement"], "IncomeStatement")
+        cf_models = self._validate_entries(CashFlowStatementListAdapter, raw["cashflow_statement"], "CashFlow")
+        metrics_models = self._validate_entries(KeyMetricsListAdapter, raw["metrics"], "KeyMetrics")
+        financials_models = self._validate_entries(RatiosListAdapter, raw["financial_metrics"], "Ratios")
 
         return bs_models, is_models, cf_models, metrics_models, financials_models
 
-    # def compute_metrics(self, income: pd.DataFrame, balance: pd.DataFrame, cashflow: pd.DataFrame, metrics: pd.DataFrame) -> pd.DataFrame:
-    #     """
-    #     Computes derived financial metrics from the base statements.
-    #     """
-    #     if income.empty or balance.empty or cashflow.empty:
-    #         return pd.DataFrame()
-
-    #     # Standardize fiscalYear column
-    #     for df in [income, balance, cashflow, metrics]:
-    #         for c in ['fiscalYear', 'fiscal_year', 'year', 'fy', 'Period']:
-    #             if c in df.columns:
-    #                 df['fiscalYear'] = df[c]
-    #                 break
-
-    #     # Merge dataframes
-    #     out = income.merge(balance, on='fiscalYear', how='outer')
-    #     out = out.merge(cashflow, on='fiscalYear', how='outer')
-    #     out = out.merge(metrics, on='fiscalYear', how='outer')
-
-    #     # Derived metrics
-    #     out['netDebt'] = (out['shortTermDebt'].fillna(0) + out['longTermDebt'].fillna(0)) - out['cashAndCashEquivalents'].fillna(0)
-    #     out['buybacks'] = -out['commonStockRepurchased'].fillna(0)
-    #     out['dividends'] = -out['commonDividendsPaid'].fillna(0)
-
-    #     # Ratios
-    #     out['OCF_to_NetIncome'] = out['operatingCashFlow'] / out['netIncome']
-    #     out['FCF_to_NetIncome'] = out['freeCashFlow'] / out['netIncome']
-    #     out['capex_to_revenue'] = out['capitalExpenditure'] / out['revenue']
-    #     out['buyback_pct_of_FCF'] = out['buybacks'] / out['freeCashFlow']
-    #     out['dividend_pct_of_FCF'] = out['dividends'] / out['freeCashFlow']
-    #     out['payout_pct_of_FCF'] = (out['buybacks'] + out['dividends']) / out['freeCashFlow']
-    #     out['current_ratio'] = out['totalAssets'] / out['totalLiabilities']
-    #     out['debt_to_equity'] = ((out['shortTermDebt'].fillna(0) + out['longTermDebt'].fillna(0)) / out['totalStockholdersEquity'])
-
-    #     out = out.replace([np.inf, -np.inf], np.nan)
-    #     return out.reset_index()
+    @staticmethod
+    def _validate_entries(adapter: TypeAdapter, entries: List[dict], label: str) -> list:
+        """
+        Validates a whole statement list in one pass. Rows that fail validation
+        are reported and dropped; the remaining rows are kept.
+        """
+        try:
+            return adapter.validate_python(entries)
+        except ValidationError as e:
+            print(f"❌ {label} validation error:", e)
+            bad_rows = {err["loc"][0] for err in e.errors() if err["loc"]}
+            return adapter.validate_python([row for i, row in enumerate(entries) if i not in bad_rows])
+
+    def compute_metrics(self, income: pd.DataFrame, balance: pd.DataFrame, cashflow: pd.DataFrame, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes derived financial metrics from the base statements.
+        """
+        if income.empty or balance.empty or cashflow.empty:
+            return pd.DataFrame()
+
+        # Standardize fiscalYear column
+        for df in [income, balance, cashflow, metrics]:
+            if 'fiscalYear' in df.columns and pd.api.types.is_integer_dtype(df['fiscalYear']):
+                continue  # already clean, nothing to rename or coerce
+            col_map = {c.lower().replace(' ', ''): c for c in df.columns}
+            # Statements disagree on the type (Ratios: int, others: str); align on Int64.
+            # A candidate without numeric years (e.g. period = "FY") is skipped.
+            years = None
+            for key in _FISCAL_YEAR_KEYS:
+                if key in col_map:
+                    candidate = pd.to_numeric(df[col_map[key]], errors='coerce')
+                    if candidate.notna().any():
+                        years = candidate.astype('Int64')
+                        break
+            if years is not None:
+                df['fiscalYear'] = years
+            elif 'date' in df.columns:
+                df['fiscalYear'] = self._year_from_dates(df['date'])
+
+        # Align statements column-wise on fiscalYear: one row per year.
+        frames = [f.set_index('fiscalYear') for f in (income, balance, cashflow, metrics) if f is not None and not f.empty]
+        out = pd.concat(frames, axis=1).sort_index()
+        out = out.loc[:, ~out.columns.duplicated()]
+
+        # Derived metrics and ratios on raw column arrays
+        derived = _metrics_kernel(*(out[c].to_numpy() for c in _KERNEL_INPUTS))
+
+        out = pd.concat([out, pd.DataFrame(derived, index=out.index)], axis=1)
+        return out.reset_index()
+
+    @staticmethod
+    def _parse_dates(dates: pd.Series) -> pd.Series:
+        """
+        Parses ISO date strings to datetime64. Uses an explicit format first and
+        only falls back to per-row inference on mismatch; already-parsed
+        columns pass through.
+        """
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates
+        try:
+            return pd.to_datetime(dates, format="%Y-%m-%d", cache=True)
+        except (ValueError, TypeError):
+            return pd.to_datetime(dates, format="mixed", errors="coerce", cache=True)
+
+    @staticmethod
+    def _year_from_dates(dates: pd.Series) -> pd.Series:
+        """
+        Derives the calendar year from ISO date strings or parsed dates.
+        """
+        return FinancialDataService._parse_dates(dates).dt.year.astype("Int64")
 
     def format_b(self, x: float) -> str:
         """Formats a number in billions."""
         try:
-            return f"${x / 1e9:,.2f}B"
+            return f"${float(x) / 1e9:,.2f}B"
         except (TypeError, ValueError):
             return str(x)
@@ -3,9 +3,90 @@ Base class for all pages in the Streamlit application.
 It provides a common structure and helper methods for all pages.
 """
 import streamlit as st
+import numpy as np
 from abc import ABC, abstractmethod
 from app.state.app_state import AppState
 from app.services.financial_data_service import FinancialDataService
+from app.config import settings
+
+# st.cache_data for page-level helpers: entries expire with the API fetch cache
+# and only the most recent few are kept.
+page_cache_data = st.cache_data(
+    ttl=settings.CACHE_TTL_SECONDS, max_entries=settings.PAGE_CACHE_MAX_ENTRIES, show_spinner=False
+)
+
+# Plotly config for charts that need no pan/zoom/hover: skips the modebar and
+# the interaction handlers on the client.
+STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+def to_float_b(data):
+    """Scales a Series/DataFrame of USD amounts to float64 billions in one vectorized pass."""
+    return data.astype("float64") / 1e9
+
+def date_sorted(df):
+    """
+    Returns a frame ordered by date for page-local use. Frames from
+    FinancialDataService.convert_to_dataframes are already sorted, so this is
+    only a shallow copy (pages may add columns without touching AppState).
+    Untagged frames that are already in order skip the sort as well, and
+    frames without a date column are passed through unchanged.
+    """
+    if "date" not in df.columns:
+        return df.copy(deep=False)
+    if df.attrs.get("sorted_by") == "date" or df["date"].is_monotonic_increasing:
+        return df.copy(deep=False)
+    return df.sort_values("date", kind="mergesort")
+
+# Upper bound on points sent to the browser per line trace
+MAX_TRACE_POINTS = 1000
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of the n_out points that best preserve the line's shape."""
+    n = len(x)
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x = x[end:edges[i + 2]].mean()
+            avg_y = y[end:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def thin_series(x, y, max_points: int = MAX_TRACE_POINTS):
+    """
+    Returns (x, y) arrays for a line trace, downsampled with LTTB when the
+    series has more than max_points non-null points. Short series pass
+    through unchanged.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    if len(y) <= max_points:
+        return x, y
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    if len(y) <= max_points:
+        return x, y
+    x_num = x.view("int64") if np.issubdtype(x.dtype, np.datetime64) else x
+    idx = _lttb_indices(x_num.astype("float64"), y, max_points)
+    return x[idx], y[idx]
+
+def band_insights(values, high, low, messages):
+    """
+    Evaluates a set of threshold rules in one vectorized pass. Returns one
+    entry per value: messages[i][0] above high[i], messages[i][1] below
+    low[i], otherwise (including NaN/None) None.
+    """
+    v = np.asarray(values, dtype="float64")
+    hit = np.where(v > high, 0, np.where(v < low, 1, -1))
+    return [msgs[h] if h >= 0 else None for msgs, h in zip(messages, hit)]
+
 
 class BasePage(ABC):
     def __init__(self, state: AppState, service: FinancialDataService):
@@ -1,39 +1,48 @@
 """
 Page Factory for creating and managing pages in the application.
 """
-from app.ui.pages.meta import ValuationProblemsPage
-from app.ui.pages.lenses import LensesPage
-from app.ui.pages.executive_page import ExecutivePage
-from app.ui.pages.profit_engine_page import ProfitEnginePage
-from app.ui.pages.cash_engine_page import CashEnginePage
-from app.ui.pages.investment_page import InvestmentPage
-from app.ui.pages.capital_allocation_page import CapitalAllocationPage
-from app.ui.pages.financial_strength_page import FinancialStrengthPage
-from app.ui.pages.valuation_page import ValuationPage
-from app.ui.pages.narrative_generator_page import NarrativeGeneratorPage
-from app.ui.pages.data_page import DataPage
+import importlib
+from functools import lru_cache
+import streamlit as st
 from app.state.app_state import AppState
 from app.services.financial_data_service import FinancialDataService
 
 class PageFactory:
+    # Page classes are registered as "module:Class" and imported on first use
     PAGES = {
-        "Executive": ExecutivePage,
-        "Profit Engine": ProfitEnginePage,
-        "Cash Engine": CashEnginePage,
-        "Investment": InvestmentPage,
-        "Capital Allocation": CapitalAllocationPage,
-        "Financial Strength": FinancialStrengthPage,
-        "Valuation": ValuationPage,
-        # "Narrative Generator": NarrativeGeneratorPage,
-        # "Data": DataPage,
-        "Lenses": LensesPage,
-        "Textbook": ValuationProblemsPage
+        "Executive": "app.ui.pages.executive_page:ExecutivePage",
+        "Profit Engine": "app.ui.pages.profit_engine_page:ProfitEnginePage",
+        "Cash Engine": "app.ui.pages.cash_engine_page:CashEnginePage",
+        "Investment": "app.ui.pages.investment_page:InvestmentPage",
+        "Capital Allocation": "app.ui.pages.capital_allocation_page:CapitalAllocationPage",
+        "Financial Strength": "app.ui.pages.financial_strength_page:FinancialStrengthPage",
+        "Valuation": "app.ui.pages.valuation_page:ValuationPage",
+        # "Narrative Generator": "app.ui.pages.narrative_generator_page:NarrativeGeneratorPage",
+        # "Data": "app.ui.pages.data_page:DataPage",
+        "Lenses": "app.ui.pages.lenses:LensesPage",
+        "Textbook": "app.ui.pages.meta:ValuationProblemsPage"
     }
 
     @staticmethod
-    def create_page(page_name: str, state: AppState, service: FinancialDataService):
-        page_class = PageFactory.PAGES.get(page_name)
-        if page_class:
-            return page_class(state, service)
-        else:
+    @lru_cache(maxsize=None)
+    def page_class(page_name: str) -> type:
+        """Resolves and imports the page class registered under page_name."""
+        target = PageFactory.PAGES.get(page_name)
+        if target is None:
             raise ValueError(f"Page '{page_name}' not found.")
+        module_path, class_name = target.split(":")
+        return getattr(importlib.import_module(module_path), class_name)
+
+    @staticmethod
+    def create_page(page_name: str, state: AppState, service: FinancialDataService):
+        """
+        Returns the page for page_name. Instances are kept in the session and
+        reused across reruns for as long as they are bound to the same state
+        and service.
+        """
+        pages = st.session_state.setdefault("_pages", {})
+        page = pages.get(page_name)
+        if page is None or page.state is not state or page.service is not service:
+            page = PageFactory.page_class(page_name)(state, service)
+            pages[page_name] = page
+        return page
@@ -1,13 +1,98 @@
 """
 Capital Allocation Page
 """
-from decimal import Decimal
 import streamlit as st
+from types import SimpleNamespace
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, STATIC_CHART_CONFIG, to_float_b, date_sorted
+
+# Capital allocation stack: category label -> derived cash flow column
+_CATEGORIES = {
+    "Reinvestment (CAPEX)": "capex",
+    "Acquisitions": "acquisitions",
+    "Investment Rotation": "investment_rotation",
+    "Debt Activity": "debt_activity",
+    "Buybacks": "buybacks",
+    "Dividends": "dividends",
+    "Other Financing": "other_financing",
+}
+
+# Latest-year deployment pie: label -> cash flow column (missing columns count as 0)
+_ALLOC_PIE_COLS = {
+    "CapEx": "capitalExpenditure",
+    "Buybacks": "commonStockRepurchased",
+    "Dividends": "dividendPaid",
+    "Debt Repayment": "debtRepayment",
+    "Acquisitions": "acquisitionsNet",
+}
+
+# Multi-year deployment trend lines: trace name -> cash flow column
+_ALLOC_TREND_COLS = {
+    "CapEx": "capitalExpenditure",
+    "Share Repurchases": "commonStockRepurchased",
+    "Dividends": "dividendPaidAndCapexCoverageRatio",
+    "Debt Repayment": "netDebtIssuance",
+}
+
+
+@page_cache_data
+def _prepare_frames(data_version, _cash: pd.DataFrame, _income: pd.DataFrame, _fin: pd.DataFrame, _bs: pd.DataFrame) -> SimpleNamespace:
+    """
+    Frames plus the derived capital allocation columns. Cached per data
+    version, so reruns skip the column derivations.
+    """
+    df_cf = date_sorted(_cash)
+
+    # Build normalized columns
+    df_cf["capex"] = df_cf["capitalExpenditure"]  # reinvestment
+    df_cf["acquisitions"] = df_cf["acquisitionsNet"]
+
+    # Investment rotation = purchases & sales of investments
+    df_cf["investment_rotation"] = df_cf[
+        ["purchasesOfInvestments", "salesMaturitiesOfInvestments", "otherInvestingActivities"]
+    ].to_numpy(dtype="float64").sum(axis=1)
+
+    # Debt activity
+    df_cf["debt_activity"] = df_cf["netDebtIssuance"]
+
+    # Shareholder returns
+    df_cf["buybacks"] = df_cf["commonStockRepurchased"]
+    df_cf["dividends"] = df_cf.get("netDividendsPaid", 0)
+
+    # Other financing
+    df_cf["other_financing"] = df_cf["otherFinancingActivities"]
+
+    return SimpleNamespace(
+        cash=df_cf,
+        income=_income,
+        fin=_fin,
+        bs=_bs,
+    )
+
+
+@page_cache_data
+def _allocation_stack_fig(data_version, _df_cf: pd.DataFrame) -> go.Figure:
+    """Stacked capital allocation bars, rebuilt only when the data version changes."""
+    long = (
+        _df_cf[["date", *_CATEGORIES.values()]]
+        .rename(columns={col: label for label, col in _CATEGORIES.items()})
+        .melt("date", var_name="Capital Allocation Category", value_name="USD")
+    )
+    long["USD"] = to_float_b(long["USD"])
+
+    fig = px.bar(
+        long,
+        x="date",
+        y="USD",
+        color="Capital Allocation Category",
+        barmode="relative",
+        title="Capital Allocation Over Time"
+    )
+    fig.update_layout(yaxis_title="USD (B)")
+    return fig
 
 
 class CapitalAllocationPage(BasePage):
@@ -18,76 +103,34 @@ class CapitalAllocationPage(BasePage):
         # --------------------------------
         # Load Data
         # --------------------------------
-        df_cash = self.state.cashflow_df.sort_values("date")
-        df_income = self.state.income_statement_df.sort_values("date")
-        df_metrics = self.state.metrics_df.sort_values("date")
-        df_fin = self.state.financials_df.sort_values("date")
-        df_bs = self.state.balance_sheet_df.sort_values("date")
+        frames = _prepare_frames(
+            self.state.data_source,
+            self.state.cashflow_df,
+            self.state.income_statement_df,
+            self.state.financials_df,
+            self.state.balance_sheet_df,
+        )
+        df_cash = df_cf = frames.cash
+        df_income = frames.income
+        df_fin = frames.fin
+        df_bs = frames.bs
 
         if df_cash.empty:
             st.warning("No cash flow data available for Capital Allocation analysis.")
             return
 
-        latest_cash = df_cash.iloc[-1]
-        latest_income = df_income.iloc[-1] if not df_income.empty else pd.Series()
-        latest_fin = df_fin.iloc[-1] if not df_fin.empty else pd.Series()
-        latest_bs = df_bs.iloc[-1] if not df_bs.empty else pd.Series()
+        latest_cash = df_cash.iloc[-1].to_dict()
+        latest_income = df_income.iloc[-1].to_dict() if not df_income.empty else {}
+        latest_fin = df_fin.iloc[-1].to_dict() if not df_fin.empty else {}
+        latest_bs = df_bs.iloc[-1].to_dict() if not df_bs.empty else {}
 
         # --------------------------------
         # Shareholder Returns (Dividends + Buybacks)
         # --------------------------------
 
-        df_cf = self.state.cashflow_df
-        df_cf = df_cf.sort_values("date")
-
-
-        # Build normalized columns
-        df_cf["capex"] = df_cf["capitalExpenditure"]  # reinvestment
-        df_cf["acquisitions"] = df_cf["acquisitionsNet"]
-
-        # Investment rotation = purchases & sales of investments
-        df_cf["investment_rotation"] = (
-            df_cf["purchasesOfInvestments"]
-            + df_cf["salesMaturitiesOfInvestments"]
-            + df_cf["otherInvestingActivities"]
-        )
-
-        # Debt activity
-        df_cf["debt_activity"] = df_cf["netDebtIssuance"]
-
-        # Shareholder returns
-        df_cf["buybacks"] = df_cf["commonStockRepurchased"]
-        df_cf["dividends"] = df_cf.get("netDividendsPaid", 0)
-
-        # Other financing
-        df_cf["other_financing"] = df_cf["otherFinancingActivities"]
-
-        categories = {
-            "Reinvestment (CAPEX)": "capex",
-            "Acquisitions": "acquisitions",
-            "Investment Rotation": "investment_rotation",
-            "Debt Activity": "debt_activity",
-            "Buybacks": "buybacks",
-            "Dividends": "dividends",
-            "Other Financing": "other_financing",
-        }
-
-        fig = go.Figure()
-
-        for label, col in categories.items():
-            fig.add_trace(go.Bar(
-                x=df_cf["date"],
-                y=df_cf[col],
-                name=label
-            ))
-
-        fig.update_layout(
-            title="Capital Allocation Over Time",
-            barmode="relative",
-            legend_title="Capital Allocation Category"
-        )
-
-        st.plotly_chart(fig)
+        version = self.state.data_source
+        fig = _allocation_stack_fig(version, df_cf)
+        st.plotly_chart(fig, key=f"cap_alloc_stack_{version}")
 
         st.write("""
         **Interpretation Guide**
@@ -106,17 +149,17 @@ class CapitalAllocationPage(BasePage):
 
         c1.metric(
             "Share Repurchases (Latest FY)",
-            f"${abs(buybacks) / Decimal(1e9):,.2f}B" if not pd.isna(buybacks) else "n/a"
+            f"${abs(buybacks) / 1e9:,.2f}B" if not pd.isna(buybacks) else "n/a"
         )
 
         # c2.metric(
         #     "Dividends Paid (Latest FY)",
-        #     f"${abs(dividends) / Decimal(1e9):,.2f}B" if not pd.isna(dividends) else "n/a"
+        #     f"${abs(dividends) / 1e9:,.2f}B" if not pd.isna(dividends) else "n/a"
         # )
 
         # c3.metric(
         #     "Net Stock Issuance",
-        #     f"${issuance / Decimal(1e9):,.2f}B" if not pd.isna(issuance) else "n/a"
+        #     f"${issuance / 1e9:,.2f}B" if not pd.isna(issuance) else "n/a"
         # )
 
         # Buyback trend
@@ -126,7 +169,7 @@ class CapitalAllocationPage(BasePage):
             y="commonStockRepurchased",
             title="Share Repurchases Over Time"
         )
-        st.plotly_chart(fig_buyback)
+        st.plotly_chart(fig_buyback, config=STATIC_CHART_CONFIG, key=f"cap_alloc_buybacks_{version}")
 
         # Dividend trend
         # if "dividendPaid" in df_cash.columns:
@@ -154,12 +197,12 @@ class CapitalAllocationPage(BasePage):
 
         colA.metric(
             "Debt Repayments (Latest FY)",
-            f"${abs(debt_repayment) / Decimal(1e9):,.2f}B" if not pd.isna(debt_repayment) else "n/a"
+            f"${abs(debt_repayment) / 1e9:,.2f}B" if not pd.isna(debt_repayment) else "n/a"
         )
 
         colB.metric(
             "Total Debt",
-            f"${total_debt / Decimal(1e9):,.2f}B" if total_debt > 0 else "n/a"
+            f"${total_debt / 1e9:,.2f}B" if total_debt > 0 else "n/a"
         )
 
         # Debt ratios
@@ -177,7 +220,7 @@ class CapitalAllocationPage(BasePage):
                 y="debtRepayment",
                 title="Debt Repayments Over Time"
             )
-            st.plotly_chart(fig_debt)
+            st.plotly_chart(fig_debt, key=f"cap_alloc_debt_{version}")
 
         st.write("---")
 
@@ -186,35 +229,18 @@ class CapitalAllocationPage(BasePage):
         # --------------------------------
         st.subheader("Free Cash Flow Allocation")
 
-        df_alloc = df_cash.copy()
-
-        # Compute FCF explicitly
-        df_alloc["FCF"] = df_alloc.get("freeCashFlow", np.nan)
-
-        # Key deployment categories
-        df_alloc["CapEx"] = df_alloc.get("capitalExpenditure", 0)
-        df_alloc["Buybacks"] = df_alloc.get("commonStockRepurchased", 0)
-        df_alloc["Dividends"] = df_alloc.get("dividendPaidAndCapexCoverageRatio", 0)
-        df_alloc["DebtRepay"] = df_alloc.get("netDebtIssuance", 0)
-        df_alloc["Acquisitions"] = df_alloc.get("acquisitionsNet", 0)
-
         # Pie chart for latest year
-        alloc_latest = {
-            "CapEx": abs(latest_cash.get("capitalExpenditure", 0)),
-            "Buybacks": abs(latest_cash.get("commonStockRepurchased", 0)),
-            "Dividends": abs(latest_cash.get("dividendPaid", 0)),
-            "Debt Repayment": abs(latest_cash.get("debtRepayment", 0)),
-            "Acquisitions": abs(latest_cash.get("acquisitionsNet", 0)),
-        }
-
-        alloc_labels = [k for k in alloc_latest.keys()]
-        alloc_values = [v for v in alloc_latest.values()]
+        alloc_values = np.abs(
+            df_cash.reindex(columns=list(_ALLOC_PIE_COLS.values()), fill_value=0)
+            .iloc[-1]
+            .to_numpy(dtype="float64")
+        )
 
         fig_alloc = go.Figure(
-            data=[go.Pie(labels=alloc_labels, values=alloc_values, hole=0.4)]
+            data=[go.Pie(labels=list(_ALLOC_PIE_COLS), values=alloc_values, hole=0.4)]
         )
         fig_alloc.update_layout(title="Capital Deployment Breakdown (Latest FY)")
-        st.plotly_chart(fig_alloc, )
+        st.plotly_chart(fig_alloc, key=f"cap_alloc_pie_{version}")
 
         st.write("---")
 
@@ -223,22 +249,18 @@ class CapitalAllocationPage(BasePage):
         # --------------------------------
         st.subheader("Capital Deployment Trends")
 
+        # Only the plotted columns are materialized, as one float64 block
+        trend_dates = df_cash["date"].to_numpy()
+        trend_values = df_cash.reindex(columns=list(_ALLOC_TREND_COLS.values()), fill_value=0).to_numpy(dtype="float64")
+
         fig_trend = go.Figure()
-        fig_trend.add_trace(go.Scatter(
-            x=df_alloc["date"], y=df_alloc["CapEx"], name="CapEx", mode="lines+markers"
-        ))
-        fig_trend.add_trace(go.Scatter(
-            x=df_alloc["date"], y=df_alloc["Buybacks"], name="Share Repurchases", mode="lines+markers"
-        ))
-        fig_trend.add_trace(go.Scatter(
-            x=df_alloc["date"], y=df_alloc["Dividends"], name="Dividends", mode="lines+markers"
-        ))
-        fig_trend.add_trace(go.Scatter(
-            x=df_alloc["date"], y=df_alloc["DebtRepay"], name="Debt Repayment", mode="lines+markers"
-        ))
+        for i, label in enumerate(_ALLOC_TREND_COLS):
+            fig_trend.add_trace(go.Scattergl(
+                x=trend_dates, y=trend_values[:, i], name=label, mode="lines+markers"
+            ))
 
         fig_trend.update_layout(title="Capital Deployment Trends (Multi-Year)")
-        st.plotly_chart(fig_trend)
+        st.plotly_chart(fig_trend, key=f"cap_alloc_trend_{version}")
 
         st.write("---")
 
@@ -274,7 +296,7 @@ class CapitalAllocationPage(BasePage):
 
         # Insight 4: Acquisitions
         acquisitions = latest_cash.get("acquisitionsNet", 0)
-        if abs(acquisitions) > Decimal(1e9):  # > $1B
+        if abs(acquisitions) > 1e9:  # > $1B
             insights.append("• Significant M&A activity detected in the latest year.")
 
         # Display insights
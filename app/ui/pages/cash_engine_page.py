@@ -1,12 +1,85 @@
 """
 Cash Engine Page
 """
-from decimal import Decimal
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, STATIC_CHART_CONFIG, to_float_b, date_sorted, band_insights
+
+# Insight rules for income quality, FCF margin and cash conversion cycle:
+# (message above the high bound, message below the low bound)
+_INSIGHT_HIGH = np.array([1.1, 0.25, 20.0])
+_INSIGHT_LOW = np.array([0.9, 0.10, 0.0])
+_INSIGHT_MESSAGES = (
+    ("• Strong earnings quality — cash flow exceeds net income.", "• Weak earnings quality — net income not fully backed by cash."),
+    ("• Exceptional free cash flow margin.", "• Low FCF margin — capex or WC may be consuming cash."),
+    ("• Long cash conversion cycle — operational liquidity risk.", "• Negative cash conversion cycle — strong supplier payment terms."),
+)
+
+# Components summed into the aggregated investing / financing cash flows;
+# columns missing from the payload count as zero
+_CFI_COLS = [
+    "capitalExpenditure",
+    "acquisitionsNet",
+    "purchaseOfInvestment",
+    "saleOfInvestment",
+    "otherInvestingActivites",
+]
+_CFF_COLS = [
+    "debtRepayment",
+    "commonStockRepurchased",
+    "commonStockIssued",
+    "dividendPaid",
+    "otherFinancingActivities",
+]
+
+
+# CFO/CFI/CFF composition chart: column -> legend label
+_CF_LABELS = {
+    "operatingCashFlow": "Operating Cash Flow (CFO)",
+    "CFI": "Investing Cash Flow (CFI)",
+    "CFF": "Financing Cash Flow (CFF)",
+}
+
+
+@page_cache_data
+def _prepare_frames(data_version, _cash: pd.DataFrame, _income: pd.DataFrame, _metrics: pd.DataFrame):
+    """
+    Frames plus aggregated CFI/CFF. Cached per data version, so reruns skip
+    the column derivations.
+    """
+    df_cash = date_sorted(_cash)
+
+    # Calculate CFI and CFF because data does not contain them aggregated
+    df_cash["CFI"] = df_cash.reindex(columns=_CFI_COLS, fill_value=0).to_numpy(dtype="float64").sum(axis=1)
+    df_cash["CFF"] = df_cash.reindex(columns=_CFF_COLS, fill_value=0).to_numpy(dtype="float64").sum(axis=1)
+
+    return df_cash, _income, _metrics
+
+
+@page_cache_data
+def _cash_flow_mix_fig(data_version, _df_cash: pd.DataFrame):
+    """Grouped CFO/CFI/CFF bars, rebuilt only when the data version changes."""
+    cf_long = _df_cash.melt(
+        id_vars="date",
+        value_vars=list(_CF_LABELS),
+        var_name="Cash Flow Type",
+        value_name="usd"
+    )
+    cf_long["Cash Flow Type"] = cf_long["Cash Flow Type"].map(_CF_LABELS)
+    cf_long["usd_b"] = to_float_b(cf_long["usd"])
+
+    return px.bar(
+        cf_long,
+        x="date",
+        y="usd_b",
+        color="Cash Flow Type",
+        barmode="group",
+        labels={"usd_b": "USD (B)"},
+        title="Cash Flow Breakdown: CFO vs CFI vs CFF"
+    )
+
 
 class CashEnginePage(BasePage):
 
@@ -16,13 +89,12 @@ class CashEnginePage(BasePage):
         # --------------------------------
         # LOAD DATA
         # --------------------------------
-        df_cash = pd.DataFrame(self.state.cashflow_df)
-        df_income = pd.DataFrame(self.state.income_statement_df)
-        df_metrics = pd.DataFrame(self.state.metrics_df)
-
-        df_cash.sort_values("date", inplace=True)
-        df_income.sort_values("date", inplace=True)
-        df_metrics.sort_values("date", inplace=True)
+        df_cash, df_income, df_metrics = _prepare_frames(
+            self.state.data_source,
+            self.state.cashflow_df,
+            self.state.income_statement_df,
+            self.state.metrics_df,
+        )
 
         latest_cash = df_cash.iloc[-1]
         latest_income = df_income.iloc[-1]
@@ -33,29 +105,17 @@ class CashEnginePage(BasePage):
         # --------------------------------
         st.subheader("Key Cash Flow Metrics")
 
-        c1, c2, c3, c4 = st.columns(4)
-
-        c1.metric(
-            "Operating Cash Flow",
-            f"${latest_cash['operatingCashFlow'] / Decimal(1e9):,.1f}B"
-        )
-
-        c2.metric(
-            "Free Cash Flow",
-            f"${latest_cash['freeCashFlow'] / Decimal(1e9):,.1f}B"
-        )
-
         fcf_margin = latest_cash["freeCashFlow"] / latest_income["revenue"]
-        c3.metric(
-            "FCF Margin",
-            f"{fcf_margin * 100:.1f}%"
-        )
-
         income_quality = latest_cash["operatingCashFlow"] / latest_income["netIncome"]
-        c4.metric(
-            "Income Quality",
-            f"{income_quality:.2f}"
+
+        kpis = (
+            ("Operating Cash Flow", f"${latest_cash['operatingCashFlow'] / 1e9:,.1f}B"),
+            ("Free Cash Flow", f"${latest_cash['freeCashFlow'] / 1e9:,.1f}B"),
+            ("FCF Margin", f"{fcf_margin * 100:.1f}%"),
+            ("Income Quality", f"{income_quality:.2f}"),
         )
+        for col, (label, value) in zip(st.columns(len(kpis)), kpis):
+            col.metric(label, value)
 
         st.write("---")
 
@@ -64,50 +124,9 @@ class CashEnginePage(BasePage):
         # --------------------------------
         st.subheader("Cash Flow Composition (CFO / CFI / CFF)")
 
-        # Calculate CFI and CFF because data does not contain them aggregated
-        df_cash["CFI"] = (
-            df_cash["capitalExpenditure"]
-            + df_cash.get("acquisitionsNet", 0)
-            + df_cash.get("purchaseOfInvestment", 0)
-            + df_cash.get("saleOfInvestment", 0)
-            + df_cash.get("otherInvestingActivites", 0)
-        )
-
-        df_cash["CFF"] = (
-            df_cash.get("debtRepayment", 0)
-            + df_cash.get("commonStockRepurchased", 0)
-            + df_cash.get("commonStockIssued", 0)
-            + df_cash.get("dividendPaid", 0)
-            + df_cash.get("otherFinancingActivities", 0)
-        )
-
-        fig_cf = go.Figure()
-
-        fig_cf.add_trace(go.Bar(
-            x=df_cash["date"],
-            y=df_cash["operatingCashFlow"],
-            name="Operating Cash Flow (CFO)"
-        ))
-
-        fig_cf.add_trace(go.Bar(
-            x=df_cash["date"],
-            y=df_cash["CFI"],
-            name="Investing Cash Flow (CFI)"
-        ))
-
-        fig_cf.add_trace(go.Bar(
-            x=df_cash["date"],
-            y=df_cash["CFF"],
-            name="Financing Cash Flow (CFF)"
-        ))
-
-        fig_cf.update_layout(
-            title="Cash Flow Breakdown: CFO vs CFI vs CFF",
-            barmode='group',
-            legend_title="Cash Flow Type"
-        )
-
-        st.plotly_chart(fig_cf)
+        version = self.state.data_source
+        fig_cf = _cash_flow_mix_fig(version, df_cash)
+        st.plotly_chart(fig_cf, config=STATIC_CHART_CONFIG, key=f"cash_engine_mix_{version}")
 
 
         st.write("---")
@@ -122,9 +141,10 @@ class CashEnginePage(BasePage):
             x="date",
             y="freeCashFlow",
             markers=True,
+            render_mode="webgl",
             title="Free Cash Flow (5-Year Trend)"
         )
-        st.plotly_chart(fig_fcf)
+        st.plotly_chart(fig_fcf, key=f"cash_engine_fcf_{version}")
 
         st.write("---")
 
@@ -137,7 +157,7 @@ class CashEnginePage(BasePage):
 
         colA.metric(
             "Capital Expenditure",
-            f"${latest_cash['capitalExpenditure'] / Decimal(1e9):,.2f}B"
+            f"${latest_cash['capitalExpenditure'] / 1e9:,.2f}B"
         )
 
         capex_intensity = abs(latest_cash["capitalExpenditure"]) / latest_cash["operatingCashFlow"]
@@ -158,7 +178,7 @@ class CashEnginePage(BasePage):
             y="capitalExpenditure",
             title="Capital Expenditure Over Time"
         )
-        st.plotly_chart(fig_capex)
+        st.plotly_chart(fig_capex, config=STATIC_CHART_CONFIG, key=f"cash_engine_capex_{version}")
 
         st.write("---")
 
@@ -173,9 +193,10 @@ class CashEnginePage(BasePage):
                 x="date",
                 y="cashConversionCycle",
                 title="Cash Conversion Cycle (Days)",
-                markers=True
+                markers=True,
+                render_mode="webgl"
             )
-            st.plotly_chart(fig_ccc)
+            st.plotly_chart(fig_ccc, key=f"cash_engine_ccc_{version}")
 
             ccc_now = latest_metrics["cashConversionCycle"]
             st.metric("Current Cash Conversion Cycle", f"{ccc_now:.1f} days")
@@ -190,41 +211,26 @@ class CashEnginePage(BasePage):
         # --------------------------------
         st.subheader("Cash Engine Insights")
 
-        insights = []
-
-        # Income quality
-        if income_quality > 1.1:
-            insights.append("• Strong earnings quality — cash flow exceeds net income.")
-        elif income_quality < 0.9:
-            insights.append("• Weak earnings quality — net income not fully backed by cash.")
-
-        # FCF margin
-        if fcf_margin > 0.25:
-            insights.append("• Exceptional free cash flow margin.")
-        elif fcf_margin < 0.10:
-            insights.append("• Low FCF margin — capex or WC may be consuming cash.")
+        ccc = latest_metrics["cashConversionCycle"] if "cashConversionCycle" in df_metrics.columns else None
+        quality_msg, fcf_msg, ccc_msg = band_insights(
+            [income_quality, fcf_margin, ccc],
+            _INSIGHT_HIGH, _INSIGHT_LOW, _INSIGHT_MESSAGES,
+        )
 
-        # Capex trend
+        # Capex and CFO trends always report a direction
         if df_cash["capitalExpenditure"].iloc[-1] < df_cash["capitalExpenditure"].iloc[-2]:
-            insights.append("• Capex declined year-over-year.")
+            capex_msg = "• Capex declined year-over-year."
         else:
-            insights.append("• Capex rising — company may be investing aggressively.")
+            capex_msg = "• Capex rising — company may be investing aggressively."
 
-        # CFO trend
         ocf_now = df_cash.iloc[-1]["operatingCashFlow"]
         ocf_prev = df_cash.iloc[-2]["operatingCashFlow"]
         if ocf_now > ocf_prev:
-            insights.append("• Operating cash flow improved year-over-year.")
+            ocf_msg = "• Operating cash flow improved year-over-year."
         else:
-            insights.append("• Operating cash flow declined — may indicate margin pressure.")
+            ocf_msg = "• Operating cash flow declined — may indicate margin pressure."
 
-        # CCC insight
-        if "cashConversionCycle" in df_metrics.columns:
-            ccc = latest_metrics["cashConversionCycle"]
-            if ccc < 0:
-                insights.append("• Negative cash conversion cycle — strong supplier payment terms.")
-            elif ccc > 20:
-                insights.append("• Long cash conversion cycle — operational liquidity risk.")
+        insights = [msg for msg in (quality_msg, fcf_msg, capex_msg, ocf_msg, ccc_msg) if msg]
 
         # Display insights
         for item in insights:
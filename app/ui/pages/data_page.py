@@ -2,7 +2,14 @@
 Data Page
 """
 import streamlit as st
-from app.ui.base_page import BasePage
+from functools import partial
+import pandas as pd
+from app.ui.base_page import BasePage, page_cache_data
+
+@page_cache_data
+def _metrics_csv(data_version, _df: pd.DataFrame) -> bytes:
+    """CSV export of the metrics frame, built once per data version."""
+    return _df.to_csv(index=False).encode("utf-8")
 
 class DataPage(BasePage):
     def render(self):
@@ -13,5 +20,6 @@ class DataPage(BasePage):
         st.dataframe(self.state.metrics_df)
 
         if self.state.metrics_df is not None and not self.state.metrics_df.empty:
-            csv = self.state.metrics_df.to_csv(index=False)
+            # The CSV is only generated when the button is clicked
+            csv = partial(_metrics_csv, self.state.data_source, self.state.metrics_df)
             st.download_button('Download metrics CSV', data=csv, file_name='metrics.csv', mime='text/csv')
@@ -2,10 +2,30 @@
 Executive Summary Page
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-from decimal import Decimal
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, band_insights
+
+_KPI_LABELS = ("Market Cap", "Revenue (FY)", "Net Income", "Free Cash Flow")
+
+# Insight rules for income quality, FCF margin, revenue growth and cash
+# conversion cycle: (message above the high bound, message below the low bound)
+_INSIGHT_HIGH = np.array([1.1, 0.20, 0.03, 20.0])
+_INSIGHT_LOW = np.array([0.9, 0.10, 0.0, 0.0])
+_INSIGHT_MESSAGES = (
+    ("• Strong cash-backed earnings (high income quality).", "• Earnings quality weakening (CFO < Net Income)."),
+    ("• Excellent free cash flow generation.", "• Weak FCF margins; investigate capex or WC changes."),
+    ("• Revenue growth accelerating year-over-year.", "• Revenue contracted last year."),
+    ("• Long cash conversion cycle — potential liquidity drag.", "• Negative cash conversion cycle — strong supplier power."),
+)
+
+@page_cache_data
+def _trend_frame(data_version, _income: pd.DataFrame, _cash: pd.DataFrame) -> pd.DataFrame:
+    """Date-indexed float64 frame feeding all three trend charts, built once per data version."""
+    income = _income.set_index("date")[["revenue", "operatingIncome"]]
+    fcf = _cash.set_index("date")["freeCashFlow"]
+    return income.join(fcf, how="outer").astype("float64")
+
 
 class ExecutivePage(BasePage):
 
@@ -15,51 +35,30 @@ class ExecutivePage(BasePage):
         # ----------------------------------------
         # LOAD DATA
         # ----------------------------------------
+        # Frames arrive sorted by date from the service
         df_income = self.state.income_statement_df
         df_cash = self.state.cashflow_df
         df_metrics = self.state.metrics_df
 
-        # Convert to DataFrame if needed
-        df_income = pd.DataFrame(df_income)
-        df_cash = pd.DataFrame(df_cash)
-        df_metrics = pd.DataFrame(df_metrics)
-
-        # Sort by date
-        df_income.sort_values("date", inplace=True)
-        df_cash.sort_values("date", inplace=True)
-        df_metrics.sort_values("date", inplace=True)
-
         # Latest values
-        latest_income = df_income.iloc[-1]
-        latest_cash = df_cash.iloc[-1]
-        latest_metrics = df_metrics.iloc[-1]
+        latest_income = df_income.iloc[-1].to_dict()
+        latest_cash = df_cash.iloc[-1].to_dict()
+        latest_metrics = df_metrics.iloc[-1].to_dict()
 
         # ----------------------------------------
         # TOP KPI BAR
         # ----------------------------------------
         st.subheader("Key Performance Indicators")
 
-        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-
-        kpi1.metric(
-            "Market Cap",
-            f"${latest_metrics['marketCap'] / Decimal(1e9):,.1f}B"
-        )
-
-        kpi2.metric(
-            "Revenue (FY)",
-            f"${latest_income['revenue'] / Decimal(1e9):,.1f}B"
-        )
-
-        kpi3.metric(
-            "Net Income",
-            f"${latest_income['netIncome'] / Decimal(1e9):,.1f}B"
-        )
-
-        kpi4.metric(
-            "Free Cash Flow",
-            f"${latest_cash['freeCashFlow'] / Decimal(1e9):,.1f}B"
-        )
+        # All four KPIs are USD amounts: scale them to billions in one pass
+        kpi_b = np.array([
+            latest_metrics["marketCap"],
+            latest_income["revenue"],
+            latest_income["netIncome"],
+            latest_cash["freeCashFlow"],
+        ], dtype="float64") / 1e9
+        for col, label, value in zip(st.columns(len(_KPI_LABELS)), _KPI_LABELS, kpi_b):
+            col.metric(label, f"${value:,.1f}B")
 
         st.write("---")
 
@@ -72,27 +71,14 @@ class ExecutivePage(BasePage):
 
         # Revenue trend
         # with col1:
-        fig_rev = px.line(
-            df_income,
-            x="date",
-            y=["revenue", "operatingIncome"],
-            title="Revenue"
-        )
-        st.plotly_chart(fig_rev, )
-        fig_op = px.line(
-            df_income,
-            x="date",
-            y="operatingIncome",
-            title="Operating Income"
-        )
-        st.plotly_chart(fig_op, )
-        fig_fcf = px.line(
-            df_cash,
-            x="date",
-            y="freeCashFlow",
-            title="Free Cash Flow"
-        )
-        st.plotly_chart(fig_fcf, )
+        # Plain time series: native line charts ship a much smaller payload than Plotly
+        trends = _trend_frame(self.state.data_source, df_income, df_cash)
+        st.caption("Revenue")
+        st.line_chart(trends[["revenue", "operatingIncome"]])
+        st.caption("Operating Income")
+        st.line_chart(trends["operatingIncome"])
+        st.caption("Free Cash Flow")
+        st.line_chart(trends["freeCashFlow"])
         # Operating income trend
         # with col2:
         #     fig_op = px.line(
@@ -146,37 +132,15 @@ class ExecutivePage(BasePage):
         # ----------------------------------------
         st.subheader("Executive Insights")
 
-        insights = []
-
-        # Insight: Income quality
-        if income_quality > 1.1:
-            insights.append("• Strong cash-backed earnings (high income quality).")
-        elif income_quality < 0.9:
-            insights.append("• Earnings quality weakening (CFO < Net Income).")
-
-        # Insight: FCF margin
-        if fcf_margin > 0.20:
-            insights.append("• Excellent free cash flow generation.")
-        elif fcf_margin < 0.10:
-            insights.append("• Weak FCF margins; investigate capex or WC changes.")
-
         # Trend-based revenue insight
-        rev_growth = (
-            df_income.iloc[-1]["revenue"] - df_income.iloc[-2]["revenue"]
-        ) / df_income.iloc[-2]["revenue"]
-
-        if rev_growth > 0.03:
-            insights.append("• Revenue growth accelerating year-over-year.")
-        elif rev_growth < 0:
-            insights.append("• Revenue contracted last year.")
-
-        # Cash conversion cycle
-        ccc = latest_metrics.get("cashConversionCycle")
-        if ccc is not None:
-            if ccc < 0:
-                insights.append("• Negative cash conversion cycle — strong supplier power.")
-            elif ccc > 20:
-                insights.append("• Long cash conversion cycle — potential liquidity drag.")
+        rev_now = df_income.iloc[-1]["revenue"]
+        rev_prev = df_income.iloc[-2]["revenue"]
+        rev_growth = (rev_now - rev_prev) / rev_prev
+
+        insights = [msg for msg in band_insights(
+            [income_quality, fcf_margin, rev_growth, latest_metrics.get("cashConversionCycle")],
+            _INSIGHT_HIGH, _INSIGHT_LOW, _INSIGHT_MESSAGES,
+        ) if msg]
 
         # Display insights
         if len(insights) == 0:
@@ -1,13 +1,305 @@
 """
 Financial Strength Page
 """
-from decimal import Decimal
+import json
 import streamlit as st
+from types import SimpleNamespace
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_datetime64_any_dtype
 import plotly.express as px
 import plotly.graph_objects as go
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, date_sorted, thin_series
+
+
+def _b(x) -> str:
+    """Formats a USD amount in billions, or "n/a" when missing."""
+    return "n/a" if x is None or pd.isna(x) else f"${x / 1e9:,.2f}B"
+
+
+@page_cache_data
+def _prepare_frames(data_version, _bs: pd.DataFrame, _cf: pd.DataFrame, _metrics: pd.DataFrame, _fin: pd.DataFrame, _income: pd.DataFrame) -> SimpleNamespace:
+    """
+    Date-sorted frames with parsed dates. Cached per data version, so reruns
+    skip the datetime coercion.
+    """
+    frames = SimpleNamespace(
+        bs=date_sorted(_bs),
+        cf=date_sorted(_cf),
+        metrics=date_sorted(_metrics),
+        fin=date_sorted(_fin),
+        income=date_sorted(_income),
+    )
+
+    # Ensure date columns are datetime where present
+    for df in (frames.bs, frames.cf, frames.metrics, frames.fin, frames.income):
+        if df is None or df.empty or "date" not in df.columns:
+            continue
+        if not is_datetime64_any_dtype(df["date"]):
+            df["date"] = pd.to_datetime(df["date"], cache=True, errors="coerce")
+
+    # Balance sheet KPI columns with their fallbacks resolved column-wise
+    bs = frames.bs
+    if not bs.empty:
+        missing = pd.Series(np.nan, index=bs.index)
+        cash_st = bs.get("cashAndShortTermInvestments", missing).combine_first(
+            bs.get("cashAndCashEquivalents", missing).add(bs.get("shortTermInvestments", missing), fill_value=0)
+        )
+        total_debt = bs.get("totalDebt", missing).combine_first(
+            bs.get("longTermDebt", missing).add(bs.get("shortTermDebt", missing), fill_value=0)
+        )
+        bs["_cashST"] = cash_st
+        bs["_totalDebt"] = total_debt
+        bs["_netDebt"] = bs.get("netDebt", missing).combine_first(total_debt - cash_st)
+        bs["_currentRatio"] = bs.get("totalCurrentAssets", missing) / bs.get("totalCurrentLiabilities", missing).replace(0, np.nan)
+    return frames
+
+
+# Plotted values are shipped to the browser as float32 typed arrays, which
+# halves the chart payload; calculations on the frames stay float64.
+_PLOT_DTYPE = np.float32
+
+
+def _safe_ratio(num, den) -> np.ndarray:
+    """Elementwise num / den as float64, NaN wherever den is zero or either side is missing."""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def _radar_scale(values: np.ndarray) -> np.ndarray:
+    """Scales non-negative values to 0..1 against a robust scale (median*3, or 1 if zero)."""
+    median = np.median(values)
+    scale = median * 3 if median > 0 else 1.0
+    return (values / scale).clip(0, 1)
+
+
+def _line_traces(df: pd.DataFrame, series, dropna: bool = True) -> list:
+    """
+    Scattergl line traces for (label, column) pairs, all sliced from one
+    shared date array. With dropna, null points are removed (and all-null
+    series skipped) so the line connects across gaps.
+    """
+    x_all = df["date"].to_numpy()
+    traces = []
+    for label, col in series:
+        x, y = x_all, df[col].to_numpy(dtype=np.float64)
+        if dropna:
+            keep = ~np.isnan(y)
+            if not keep.any():
+                continue
+            x, y = x[keep], y[keep]
+        x, y = thin_series(x, y)
+        traces.append(go.Scattergl(x=x, y=y.astype(_PLOT_DTYPE), mode="lines", name=label))
+    return traces
+
+
+@page_cache_data
+def _build_figures(data_version, _frames: SimpleNamespace, radar_vals: dict) -> dict:
+    """
+    All charts on the page keyed by name as Plotly JSON, None where the inputs
+    are missing. Cached per data version as serialized strings, so reruns skip
+    both figure construction and re-serialization.
+    """
+    df_bs, df_cf, df_metrics, df_fin = _frames.bs, _frames.cf, _frames.metrics, _frames.fin
+    bs_cols, cf_cols, metrics_cols, fin_cols = (set(d.columns) if d is not None else set() for d in (df_bs, df_cf, df_metrics, df_fin))
+    figs = {}
+
+    # Liquidity ratios trend
+    liquidity_cols = []
+    if not df_metrics.empty and "currentRatio" in metrics_cols:
+        liquidity_cols.append(("Current Ratio", "currentRatio"))
+    if not df_metrics.empty and "quickRatio" in metrics_cols:
+        liquidity_cols.append(("Quick Ratio", "quickRatio"))
+    if not df_metrics.empty and "cashRatio" in metrics_cols:
+        liquidity_cols.append(("Cash Ratio", "cashRatio"))
+
+    figs["liquidity"] = None
+    if liquidity_cols:
+        fig = go.Figure()
+        fig.add_traces(_line_traces(df_metrics, liquidity_cols))
+        fig.update_layout(title="Liquidity Ratios Over Time", yaxis_title="Ratio")
+        figs["liquidity"] = fig
+
+    # Debt composition chart: short-term vs long-term debt (balance sheet)
+    debt_components = {}
+    if not df_bs.empty:
+        debt_components = {col: name for col, name in [("shortTermDebt", "Short-Term Debt"), ("longTermDebt", "Long-Term Debt")] if col in bs_cols}
+    figs["debt"] = None
+    if debt_components:
+        debt_wide = df_bs[["date", *debt_components]].rename(columns=debt_components)
+        # plot cash on top as negative (to show net-debt visually)
+        if "cashAndShortTermInvestments" in bs_cols:
+            debt_wide["Cash & ST Inv. (offset)"] = -df_bs["cashAndShortTermInvestments"]
+        debt_long = debt_wide.melt(id_vars="date", var_name="Component", value_name="USD").astype({"USD": _PLOT_DTYPE})
+        figs["debt"] = px.bar(debt_long, x="date", y="USD", color="Component", barmode="stack", title="Debt Composition vs Cash (stacked)")
+
+    # Leverage ratios trend (debtToEquity, debtToAssets, financialLeverage)
+    leverage_cols = []
+    for col in ["debtToEquityRatio", "debtToAssetsRatio", "financialLeverageRatio", "debtToCapitalRatio"]:
+        if col in fin_cols:
+            leverage_cols.append(col)
+
+    figs["leverage"] = None
+    if leverage_cols:
+        fig_lev = go.Figure()
+        fig_lev.add_traces(_line_traces(df_fin, [(col, col) for col in leverage_cols], dropna=False))
+        fig_lev.update_layout(title="Leverage Ratios Over Time", yaxis_title="Ratio")
+        figs["leverage"] = fig_lev
+
+    # Coverage ratios trend
+    coverage_series = []
+    if "interestCoverageRatio" in fin_cols:
+        coverage_series.append(("Interest Coverage (reported)", "interestCoverageRatio"))
+    if "debtServiceCoverageRatio" in fin_cols:
+        coverage_series.append(("Debt Service Coverage", "debtServiceCoverageRatio"))
+    if "operatingCashFlowCoverageRatio" in fin_cols:
+        coverage_series.append(("OpCF Coverage Ratio", "operatingCashFlowCoverageRatio"))
+    figs["coverage"] = None
+    if coverage_series:
+        fig_cov = go.Figure()
+        fig_cov.add_traces(_line_traces(df_fin, coverage_series))
+        fig_cov.update_layout(title="Coverage Ratios Over Time", yaxis_title="Ratio")
+        figs["coverage"] = fig_cov
+
+    # Interest paid vs EBIT (compute interest coverage if not present)
+    figs["interest_coverage"] = None
+    if ("interestPaid" in cf_cols) and (("ebit" in cf_cols) or ("ebit" in fin_cols)):
+        # try to align series from cashflow and income
+        ebit_series = None
+        income_df = _frames.income
+        if not income_df.empty and "ebit" in income_df.columns:
+            ebit_series = income_df[["date", "ebit"]]
+        elif "ebit" in cf_cols:
+            ebit_series = df_cf[["date", "ebit"]]
+        if ebit_series is not None:
+            # Inner-join on date, then one mask drops null EBIT, null and zero interest together
+            # (merge, not an index concat: repeated dates, NaT included, must not raise)
+            both = ebit_series.merge(df_cf[["date", "interestPaid"]], on="date", how="inner")
+            ebit_v = both["ebit"].to_numpy(dtype=np.float64)
+            interest_v = both["interestPaid"].to_numpy(dtype=np.float64)
+            ratio = _safe_ratio(ebit_v, interest_v)
+            keep = ~np.isnan(ratio)
+            coverage = pd.DataFrame({"date": both["date"].to_numpy()[keep], "interest_coverage": ratio[keep].astype(_PLOT_DTYPE)})
+            if not coverage.empty:
+                figs["interest_coverage"] = px.line(coverage, x="date", y="interest_coverage", title="Computed Interest Coverage (EBIT / Interest Paid)", markers=True)
+
+    # Working capital components, preferring balance sheet over cashflow line items
+    wc_df = None
+    if not df_bs.empty and {"accountsReceivables", "inventory", "totalPayables"}.issubset(bs_cols):
+        wc_df = df_bs[["date", "accountsReceivables", "inventory", "totalPayables"]].copy()
+        wc_df = wc_df.rename(columns={"accountsReceivables": "Receivables", "inventory": "Inventory", "totalPayables": "Payables"})
+    elif not df_cf.empty and {"accountsReceivables", "inventory", "accountsPayables"}.issubset(cf_cols):
+        wc_df = df_cf[["date", "accountsReceivables", "inventory", "accountsPayables"]].copy()
+        wc_df = wc_df.rename(columns={"accountsReceivables": "Receivables", "inventory": "Inventory", "accountsPayables": "Payables"})
+    figs["working_capital"] = None
+    if wc_df is not None:
+        wc_long = wc_df.melt(id_vars="date", var_name="Component", value_name="USD").astype({"USD": _PLOT_DTYPE})
+        figs["working_capital"] = px.bar(wc_long, x="date", y="USD", color="Component", barmode="group", title="Working Capital Components")
+
+    # Cash conversion cycle (metrics)
+    figs["ccc"] = None
+    if "cashConversionCycle" in metrics_cols:
+        ccc = df_metrics[["date", "cashConversionCycle"]].dropna().astype({"cashConversionCycle": _PLOT_DTYPE})
+        figs["ccc"] = px.line(ccc, x="date", y="cashConversionCycle", title="Cash Conversion Cycle (days)", markers=True)
+
+    # Net debt vs liquidity
+    figs["net_debt"] = None
+    if not df_bs.empty:
+        # cash-like and total debt with their fallbacks were resolved in _prepare_frames
+        total_debt = df_bs["_totalDebt"].to_numpy(dtype=np.float64)
+        cash_like = df_bs["_cashST"].to_numpy(dtype=np.float64)
+        net_debt_calc = np.subtract(total_debt, cash_like)
+        fig_nd = go.Figure()
+        fig_nd.add_trace(go.Bar(x=df_bs["date"], y=total_debt.astype(_PLOT_DTYPE), name="Total Debt"))
+        fig_nd.add_trace(go.Bar(x=df_bs["date"], y=cash_like.astype(_PLOT_DTYPE), name="Cash & ST Inv."))
+        x, y = thin_series(df_bs["date"], net_debt_calc)
+        fig_nd.add_trace(go.Scattergl(x=x, y=y.astype(_PLOT_DTYPE), mode="lines", name="Net Debt (calc)", yaxis="y2"))
+        # add second y-axis
+        fig_nd.update_layout(
+            title="Total Debt vs Cash-like Assets (Net Debt overlay)",
+            yaxis_title="USD",
+            yaxis2=dict(title="Net Debt", overlaying="y", side="right")
+        )
+        figs["net_debt"] = fig_nd
+
+    # Solvency radar: plotted if at least 3 metrics are available
+    figs["radar"] = None
+    labels = np.array(list(radar_vals), dtype=object)
+    values = np.abs(np.fromiter(radar_vals.values(), dtype=float, count=len(radar_vals)))
+    mask = ~np.isnan(values)
+    if mask.sum() >= 3:
+        # normalize each metric for radar plotting (simple percentile-style scaling)
+        labels = labels[mask].tolist()
+        values = values[mask]
+        values_scaled = _radar_scale(values)
+        # close the loop
+        labels_loop = labels + [labels[0]]
+        vals_loop = list(values_scaled) + [values_scaled[0]]
+        fig_radar = go.Figure()
+        fig_radar.add_trace(go.Scatterpolar(r=vals_loop, theta=labels_loop, fill='toself', name="Latest (normalized)"))
+        fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0,1])), showlegend=False, title="Solvency Radar (normalized)")
+        figs["radar"] = fig_radar
+
+    return {name: fig.to_json() if fig is not None else None for name, fig in figs.items()}
+
+
+# Scorecard bands: (ascending thresholds, score per bucket, searchsorted side).
+# side="right" puts a value equal to a threshold in the upper bucket.
+_LR_BANDS = (np.array([0.8, 1.0, 1.5]), np.array([20, 50, 70, 90]), "right")      # current ratio, higher is better
+_ND_BANDS = (np.array([1.0, 2.0, 3.0]), np.array([90, 70, 50, 20]), "right")      # net debt / EBITDA, lower is better
+_IC_BANDS = (np.array([2.0, 4.0, 10.0]), np.array([20, 50, 70, 90]), "right")     # interest coverage
+_OCF_BANDS = (np.array([0.1, 0.2, 0.5]), np.array([30, 50, 70, 90]), "left")      # OCF / total debt
+_CCC_BANDS = (np.array([0.0, 30.0, 60.0]), np.array([90, 70, 50, 20]), "right")   # cash conversion cycle, lower is better
+
+
+def _band_score(value, bands, default=50) -> int:
+    """Looks up the score for value in a threshold table; missing values get the neutral default."""
+    if value is None or pd.isna(value):
+        return default
+    thresholds, scores, side = bands
+    return int(scores[np.searchsorted(thresholds, value, side=side)])
+
+
+def _scorecard(current_ratio, nd_to_ebitda, ic, ocf, total_debt, ccc_val) -> dict:
+    """Rule-based component scores (0..100 each) from the latest-period scalars."""
+    ocf_debt = float(_safe_ratio(ocf, total_debt))
+
+    return {
+        "Liquidity": _band_score(current_ratio, _LR_BANDS),
+        "Leverage": _band_score(nd_to_ebitda, _ND_BANDS),
+        "Coverage": _band_score(ic, _IC_BANDS),
+        "Cash generation": _band_score(ocf_debt, _OCF_BANDS),
+        "Working capital": _band_score(ccc_val, _CCC_BANDS),
+    }
+
+
+# Solvency radar axes: label -> metrics/financial_metrics column
+_RADAR_COLS = {
+    "Current Ratio": "currentRatio",
+    "Quick Ratio": "quickRatio",
+    "Cash Ratio": "cashRatio",
+    "Debt/Equity": "debtToEquityRatio",
+    "NetDebt/EBITDA": "netDebtToEBITDA",
+    "Interest Coverage": "interestCoverageRatio",
+    "OpCF Coverage": "operatingCashFlowCoverageRatio",
+}
+
+# Latest-period fields read by render(); missing ones come back as NaN
+_BS_FIELDS = ("_cashST", "_totalDebt", "_netDebt", "_currentRatio", "ebitda")
+_CF_FIELDS = ("ebit", "interestPaid", "operatingCashFlow")
+_METRIC_FIELDS = ("netDebtToEBITDA", "ebitda", "currentRatio", "cashConversionCycle", "operatingCashFlow", *_RADAR_COLS.values())
+_FIN_FIELDS = ("interestCoverageRatio", *_RADAR_COLS.values())
+
+
+def _latest(df: pd.DataFrame, fields) -> dict:
+    """The last row of a date-sorted frame restricted to fields, NaN-filled."""
+    if df.empty:
+        return dict.fromkeys(fields, np.nan)
+    return df.iloc[-1].reindex(list(dict.fromkeys(fields))).to_dict()
+
 
 class FinancialStrengthPage(BasePage):
     def render(self):
@@ -16,24 +308,22 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         # Load & prepare data
         # -------------------------
-        # self.data is assumed to be a dict of DataFrames or lists
-        df_bs = self.state.balance_sheet_df.sort_values("date")
-        df_cf = self.state.cashflow_df.sort_values("date")
-        df_metrics = self.state.metrics_df.sort_values("date")
-        df_fin = self.state.financials_df.sort_values("date")
-
-        # Ensure date columns are datetime where present
-        for df in (df_bs, df_cf, df_metrics, df_fin):
-            if df is None or df.empty:
-                continue
-            if "date" in df.columns:
-                df["date"] = pd.to_datetime(df["date"])
+        version = self.state.data_source
+        frames = _prepare_frames(
+            version,
+            self.state.balance_sheet_df,
+            self.state.cashflow_df,
+            self.state.metrics_df,
+            self.state.financials_df,
+            self.state.income_statement_df,
+        )
+        df_bs, df_cf, df_metrics, df_fin = frames.bs, frames.cf, frames.metrics, frames.fin
 
         # pick latest safe rows
-        latest_bs = df_bs.iloc[-1] if not df_bs.empty else pd.Series()
-        latest_cf = df_cf.iloc[-1] if not df_cf.empty else pd.Series()
-        latest_metrics = df_metrics.iloc[-1] if not df_metrics.empty else pd.Series()
-        latest_fin = df_fin.iloc[-1] if not df_fin.empty else pd.Series()
+        bs = _latest(df_bs, _BS_FIELDS)
+        cf = _latest(df_cf, _CF_FIELDS)
+        mx = _latest(df_metrics, _METRIC_FIELDS)
+        fx = _latest(df_fin, _FIN_FIELDS)
 
         # -------------------------
         # KPI BAR (Top)
@@ -43,55 +333,49 @@ class FinancialStrengthPage(BasePage):
         k1, k2, k3, k4, k5 = st.columns(5)
 
         # Cash & short-term investments (balance sheet)
-        cash_and_st = (
-            latest_bs.get("cashAndShortTermInvestments")
-            or (latest_bs.get("cashAndCashEquivalents") + latest_bs.get("shortTermInvestments", 0))
-            or np.nan
-        )
-        k1.metric("Cash + Short-term Inv.", f"${(cash_and_st or np.nan)/Decimal(1e9):,.2f}B")
+        cash_and_st = bs["_cashST"]
+        k1.metric("Cash + Short-term Inv.", _b(cash_and_st))
 
         # Total debt & net debt
-        total_debt = latest_bs.get("totalDebt", latest_bs.get("longTermDebt", 0) + latest_bs.get("shortTermDebt", 0))
-        net_debt = latest_bs.get("netDebt", latest_bs.get("totalDebt", np.nan) - cash_and_st) if not pd.isna(latest_bs.get("netDebt", np.nan)) else np.nan
-        k2.metric("Total Debt", f"${(total_debt or np.nan)/Decimal(1e9):,.2f}B")
-        k3.metric("Net Debt", f"${(net_debt or np.nan)/Decimal(1e9):,.2f}B")
+        total_debt = bs["_totalDebt"]
+        net_debt = bs["_netDebt"]
+        k2.metric("Total Debt", _b(total_debt))
+        k3.metric("Net Debt", _b(net_debt))
 
         # Net debt / EBITDA (from metrics or compute)
-        nd_to_ebitda = latest_metrics.get("netDebtToEBITDA", np.nan)
+        nd_to_ebitda = mx["netDebtToEBITDA"]
         if pd.isna(nd_to_ebitda):
             # attempt compute
-            ebitda = latest_bs.get("ebitda", latest_cf.get("ebitda", np.nan)) if not pd.isna(latest_bs.get("ebitda", np.nan)) else latest_metrics.get("ebitda")
+            ebitda = bs["ebitda"] if not pd.isna(bs["ebitda"]) else mx["ebitda"]
             if (not pd.isna(net_debt)) and (not pd.isna(ebitda)) and ebitda != 0:
                 nd_to_ebitda = net_debt / ebitda
         k4.metric("Net Debt / EBITDA", f"{nd_to_ebitda:.2f}x" if not pd.isna(nd_to_ebitda) else "n/a")
 
         # Current ratio (prefers metrics)
-        current_ratio = latest_metrics.get("currentRatio", latest_bs.get("totalCurrentAssets") / latest_bs.get("totalCurrentLiabilities") if (not df_bs.empty and latest_bs.get("totalCurrentLiabilities", 0) != 0) else np.nan)
+        current_ratio = mx["currentRatio"]
+        if pd.isna(current_ratio):
+            current_ratio = bs["_currentRatio"]
         k5.metric("Current Ratio", f"{current_ratio:.2f}" if not pd.isna(current_ratio) else "n/a")
 
         st.write("---")
 
+        # Latest values for the solvency radar
+        # (nothing to extract when neither ratio table is loaded)
+        latest_vals = {}
+        if not (df_metrics.empty and df_fin.empty):
+            radar_cols = list(_RADAR_COLS.values())
+            radar_vals = pd.Series(mx).reindex(radar_cols).combine_first(pd.Series(fx).reindex(radar_cols)).to_numpy(dtype=float)
+            latest_vals = dict(zip(_RADAR_COLS, radar_vals))
+
+        figs = _build_figures(version, frames, latest_vals)
+
         # -------------------------
         # Liquidity Ratios Trend
         # -------------------------
         st.subheader("Liquidity Ratios — Multi-year Trend")
 
-        liquidity_cols = []
-        if not df_metrics.empty and "currentRatio" in df_metrics.columns:
-            liquidity_cols.append(("Current Ratio", "currentRatio"))
-        if not df_metrics.empty and "quickRatio" in df_metrics.columns:
-            liquidity_cols.append(("Quick Ratio", "quickRatio"))
-        if not df_metrics.empty and "cashRatio" in df_metrics.columns:
-            liquidity_cols.append(("Cash Ratio", "cashRatio"))
-
-        if liquidity_cols:
-            fig = go.Figure()
-            for label, col in liquidity_cols:
-                series = df_metrics[[ "date", col ]].dropna()
-                if not series.empty:
-                    fig.add_trace(go.Line(x=series["date"], y=series[col], name=label))
-            fig.update_layout(title="Liquidity Ratios Over Time", yaxis_title="Ratio")
-            st.plotly_chart(fig, )
+        if figs["liquidity"] is not None:
+            st.plotly_chart(json.loads(figs["liquidity"]))
         else:
             st.info("No multi-year liquidity ratios available in metrics table.")
 
@@ -100,36 +384,13 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Leverage & Debt Composition")
 
-        # Debt composition chart: short-term vs long-term debt (balance sheet)
-        debt_components = []
-        if not df_bs.empty:
-            for col, name in [("shortTermDebt", "Short-Term Debt"), ("longTermDebt", "Long-Term Debt")]:
-                if col in df_bs.columns:
-                    debt_components.append((name, col))
-        if debt_components:
-            fig_debt = go.Figure()
-            for name, col in debt_components:
-                fig_debt.add_trace(go.Bar(x=df_bs["date"], y=df_bs[col], name=name))
-            # plot cash on top as negative (to show net-debt visually)
-            if "cashAndShortTermInvestments" in df_bs.columns:
-                fig_debt.add_trace(go.Bar(x=df_bs["date"], y=-df_bs["cashAndShortTermInvestments"], name="Cash & ST Inv. (offset)"))
-            fig_debt.update_layout(barmode="stack", title="Debt Composition vs Cash (stacked)")
-            st.plotly_chart(fig_debt, )
+        if figs["debt"] is not None:
+            st.plotly_chart(json.loads(figs["debt"]))
         else:
             st.info("No short/long-term debt fields present to chart composition.")
 
-        # Leverage ratios trend (debtToEquity, debtToAssets, financialLeverage)
-        leverage_cols = []
-        for col in ["debtToEquityRatio", "debtToAssetsRatio", "financialLeverageRatio", "debtToCapitalRatio"]:
-            if col in df_fin.columns:
-                leverage_cols.append(col)
-
-        if leverage_cols:
-            fig_lev = go.Figure()
-            for col in leverage_cols:
-                fig_lev.add_trace(go.Line(x=df_fin["date"], y=df_fin[col], name=col))
-            fig_lev.update_layout(title="Leverage Ratios Over Time", yaxis_title="Ratio")
-            st.plotly_chart(fig_lev, )
+        if figs["leverage"] is not None:
+            st.plotly_chart(json.loads(figs["leverage"]))
 
         st.write("---")
 
@@ -138,40 +399,13 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Coverage Ratios & Interest Burden")
 
-        coverage_series = []
-        if "interestCoverageRatio" in df_fin.columns:
-            coverage_series.append(("Interest Coverage (reported)", "interestCoverageRatio"))
-        if "debtServiceCoverageRatio" in df_fin.columns:
-            coverage_series.append(("Debt Service Coverage", "debtServiceCoverageRatio"))
-        if "operatingCashFlowCoverageRatio" in df_fin.columns:
-            coverage_series.append(("OpCF Coverage Ratio", "operatingCashFlowCoverageRatio"))
-        if coverage_series:
-            fig_cov = go.Figure()
-            for label, col in coverage_series:
-                s = df_fin[["date", col]].dropna()
-                if not s.empty:
-                    fig_cov.add_trace(go.Line(x=s["date"], y=s[col], name=label))
-            fig_cov.update_layout(title="Coverage Ratios Over Time", yaxis_title="Ratio")
-            st.plotly_chart(fig_cov, )
+        if figs["coverage"] is not None:
+            st.plotly_chart(json.loads(figs["coverage"]))
         else:
             st.info("No coverage ratios in financial metrics to chart.")
 
-        # Interest paid vs EBIT (compute interest coverage if not present)
-        if ("interestPaid" in df_cf.columns) and (("ebit" in df_cf.columns) or ("ebit" in df_fin.columns) or ("ebit" in df_cf.columns)):
-            # try to align series from cashflow and income
-            ebit_series = None
-            income_df = self.state.get("income_statement", []).sort_values("date")
-            if not income_df.empty and "ebit" in income_df.columns:
-                ebit_series = income_df[["date", "ebit"]]
-            elif "ebit" in df_cf.columns:
-                ebit_series = df_cf[["date", "ebit"]]
-            interest_series = df_cf[["date", "interestPaid"]].dropna()
-            if ebit_series is not None and not interest_series.empty:
-                merged = pd.merge(ebit_series, interest_series, on="date", how="inner").dropna()
-                if not merged.empty:
-                    merged["interest_coverage"] = merged["ebit"] / merged["interestPaid"].replace({0: np.nan})
-                    fig_ic = px.line(merged, x="date", y="interest_coverage", title="Computed Interest Coverage (EBIT / Interest Paid)", markers=True)
-                    st.plotly_chart(fig_ic, )
+        if figs["interest_coverage"] is not None:
+            st.plotly_chart(json.loads(figs["interest_coverage"]))
 
         st.write("---")
 
@@ -180,31 +414,14 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Working Capital Components & Cash Conversion")
 
-        # Build components if present in balance sheet or cashflow
-        wc_df = None
-        # prefer balance sheet components over cashflow line items
-        if not df_bs.empty and set(["accountsReceivables", "inventory", "totalPayables"]).issubset(set(df_bs.columns)):
-            wc_df = df_bs[["date", "accountsReceivables", "inventory", "totalPayables"]].copy()
-            wc_df = wc_df.rename(columns={"accountsReceivables": "Receivables", "inventory": "Inventory", "totalPayables": "Payables"})
-        elif not df_cf.empty and set(["accountsReceivables", "inventory", "accountsPayables"]).issubset(set(df_cf.columns)):
-            wc_df = df_cf[["date", "accountsReceivables", "inventory", "accountsPayables"]].copy()
-            wc_df = wc_df.rename(columns={"accountsReceivables": "Receivables", "inventory": "Inventory", "accountsPayables": "Payables"})
-        if wc_df is not None:
-            fig_wc = go.Figure()
-            fig_wc.add_trace(go.Bar(x=wc_df["date"], y=wc_df["Receivables"], name="Receivables"))
-            fig_wc.add_trace(go.Bar(x=wc_df["date"], y=wc_df["Inventory"], name="Inventory"))
-            fig_wc.add_trace(go.Bar(x=wc_df["date"], y=wc_df["Payables"], name="Payables"))
-            fig_wc.update_layout(barmode="group", title="Working Capital Components")
-            st.plotly_chart(fig_wc, )
+        if figs["working_capital"] is not None:
+            st.plotly_chart(json.loads(figs["working_capital"]))
         else:
             st.info("No detailed working capital components available to chart.")
 
-        # Cash conversion cycle (metrics)
-        if "cashConversionCycle" in df_metrics.columns:
-            ccc = df_metrics[["date", "cashConversionCycle"]].dropna()
-            fig_ccc = px.line(ccc, x="date", y="cashConversionCycle", title="Cash Conversion Cycle (days)", markers=True)
-            st.plotly_chart(fig_ccc, )
-            st.write(f"Latest CCC: {ccc['cashConversionCycle'].iloc[-1]:.1f} days")
+        if figs["ccc"] is not None:
+            st.plotly_chart(json.loads(figs["ccc"]))
+            st.write(f"Latest CCC: {df_metrics['cashConversionCycle'].dropna().iloc[-1]:.1f} days")
         else:
             st.info("cashConversionCycle not present in metrics.")
 
@@ -215,25 +432,8 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Net Debt vs Liquidity & Short-Term Investments")
 
-        if not df_bs.empty:
-            df_nd = df_bs.copy()
-            # compute cash-like = cashAndShortTermInvestments (fallback)
-            if "cashAndShortTermInvestments" in df_nd.columns:
-                df_nd["cash_like"] = df_nd["cashAndShortTermInvestments"]
-            else:
-                df_nd["cash_like"] = df_nd.get("cashAndCashEquivalents", 0) + df_nd.get("shortTermInvestments", 0)
-            df_nd["net_debt_calc"] = df_nd.get("totalDebt", 0) - df_nd["cash_like"]
-            fig_nd = go.Figure()
-            fig_nd.add_trace(go.Bar(x=df_nd["date"], y=df_nd["totalDebt"], name="Total Debt"))
-            fig_nd.add_trace(go.Bar(x=df_nd["date"], y=df_nd["cash_like"], name="Cash & ST Inv."))
-            fig_nd.add_trace(go.Line(x=df_nd["date"], y=df_nd["net_debt_calc"], name="Net Debt (calc)", yaxis="y2"))
-            # add second y-axis
-            fig_nd.update_layout(
-                title="Total Debt vs Cash-like Assets (Net Debt overlay)",
-                yaxis_title="USD",
-                yaxis2=dict(title="Net Debt", overlaying="y", side="right")
-            )
-            st.plotly_chart(fig_nd, )
+        if figs["net_debt"] is not None:
+            st.plotly_chart(json.loads(figs["net_debt"]))
         else:
             st.info("Balance sheet needed for net debt chart.")
 
@@ -244,46 +444,8 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Solvency Radar — relative view")
 
-        radar_items = []
-        radar_cols = {
-            "Current Ratio": "currentRatio",
-            "Quick Ratio": "quickRatio",
-            "Cash Ratio": "cashRatio",
-            "Debt/Equity": "debtToEquityRatio",
-            "NetDebt/EBITDA": "netDebtToEBITDA",
-            "Interest Coverage": "interestCoverageRatio",
-            "OpCF Coverage": "operatingCashFlowCoverageRatio"
-        }
-        latest_vals = {}
-        for label, col in radar_cols.items():
-            val = None
-            if col in latest_metrics:
-                val = latest_metrics.get(col)
-            elif col in latest_fin:
-                val = latest_fin.get(col)
-            else:
-                val = np.nan
-            # coerce netDebtToEBITDA naming
-            if col == "netDebtToEBITDA" and pd.isna(val):
-                val = latest_metrics.get("netDebtToEBITDA", np.nan)
-            latest_vals[label] = val
-
-        # If at least 3 metrics available, plot radar
-        available = {k: v for k, v in latest_vals.items() if (not pd.isna(v))}
-        if len(available) >= 3:
-            # normalize each metric for radar plotting (simple percentile-style scaling)
-            labels = list(available.keys())
-            values = np.array([abs(available[l]) for l in labels], dtype=float)
-            # scale to 0-1 by dividing by a robust scale (median*3 or 1 if zero)
-            scale = np.median(values) * 3 if np.median(values) > 0 else 1.0
-            values_scaled = (values / scale).clip(0, 1)
-            # close the loop
-            labels_loop = labels + [labels[0]]
-            vals_loop = list(values_scaled) + [values_scaled[0]]
-            fig_radar = go.Figure()
-            fig_radar.add_trace(go.Scatterpolar(r=vals_loop, theta=labels_loop, fill='toself', name="Latest (normalized)"))
-            fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0,1])), showlegend=False, title="Solvency Radar (normalized)")
-            st.plotly_chart(fig_radar, )
+        if figs["radar"] is not None:
+            st.plotly_chart(json.loads(figs["radar"]))
         else:
             st.info("Not enough solvency metrics available for radar (need >=3).")
 
@@ -294,94 +456,24 @@ class FinancialStrengthPage(BasePage):
         # -------------------------
         st.subheader("Quantitative Risk Scorecard (simple rule-based)")
 
-        # Score components (0..100 each)
-        score = 0
-        max_score = 500  # 5 categories * 100
-
-        # Liquidity score (current ratio)
-        lr = current_ratio if not pd.isna(current_ratio) else None
-        if lr is None:
-            liq_score = 50
-        else:
-            if lr >= 1.5:
-                liq_score = 90
-            elif lr >= 1.0:
-                liq_score = 70
-            elif lr >= 0.8:
-                liq_score = 50
-            else:
-                liq_score = 20
-        score += liq_score
-
-        # Leverage score (netDebt/EBITDA)
-        nd_score = 50
-        if not pd.isna(nd_to_ebitda):
-            if nd_to_ebitda < 1:
-                nd_score = 90
-            elif nd_to_ebitda < 2:
-                nd_score = 70
-            elif nd_to_ebitda < 3:
-                nd_score = 50
-            else:
-                nd_score = 20
-        score += nd_score
-
-        # Coverage score (interest coverage)
-        ic = latest_fin.get("interestCoverageRatio", np.nan)
-        if pd.isna(ic) and "interestPaid" in latest_cf and "ebit" in latest_cf:
-            ic = (latest_cf.get("ebit") / (latest_cf.get("interestPaid") or np.nan)) if latest_cf.get("interestPaid", 0) != 0 else np.nan
+        # Coverage input: reported interest coverage, else EBIT / interest paid
+        ic = fx["interestCoverageRatio"]
         if pd.isna(ic):
-            ic_score = 50
-        else:
-            if ic >= 10:
-                ic_score = 90
-            elif ic >= 4:
-                ic_score = 70
-            elif ic >= 2:
-                ic_score = 50
-            else:
-                ic_score = 20
-        score += ic_score
-
-        # Cash generation score (operating cash flow / debt)
-        ocf = latest_cf.get("operatingCashFlow", latest_metrics.get("operatingCashFlow", np.nan))
-        if (not pd.isna(ocf)) and (not pd.isna(total_debt)) and total_debt != 0:
-            ocf_debt = ocf / total_debt
-            if ocf_debt > 0.5:
-                ocf_score = 90
-            elif ocf_debt > 0.2:
-                ocf_score = 70
-            elif ocf_debt > 0.1:
-                ocf_score = 50
-            else:
-                ocf_score = 30
-        else:
-            ocf_score = 50
-        score += ocf_score
+            ic = float(_safe_ratio(cf["ebit"], cf["interestPaid"]))
+        ocf = cf["operatingCashFlow"] if not pd.isna(cf["operatingCashFlow"]) else mx["operatingCashFlow"]
+        ccc_val = mx["cashConversionCycle"]
 
-        # Working capital health (cash conversion cycle)
-        ccc_val = latest_metrics.get("cashConversionCycle", np.nan)
-        if pd.isna(ccc_val):
-            ccc_score = 50
+        if pd.isna([current_ratio, nd_to_ebitda, ic, ocf, ccc_val]).all():
+            st.info("Not enough liquidity, leverage or coverage data to score.")
         else:
-            # shorter (especially negative) is better
-            if ccc_val < 0:
-                ccc_score = 90
-            elif ccc_val < 30:
-                ccc_score = 70
-            elif ccc_val < 60:
-                ccc_score = 50
-            else:
-                ccc_score = 20
-        score += ccc_score
-
-        # Display scorecard
-        st.markdown(f"**Aggregate Risk Score:** **{int(score / max_score * 100)} / 100**")
-        st.write(f"- Liquidity score: {liq_score} / 100")
-        st.write(f"- Leverage score: {nd_score} / 100")
-        st.write(f"- Coverage score: {ic_score} / 100")
-        st.write(f"- Cash generation score: {ocf_score} / 100")
-        st.write(f"- Working capital score: {ccc_score} / 100")
+            scores = _scorecard(current_ratio, nd_to_ebitda, ic, ocf, total_debt, ccc_val)
+            max_score = 500  # 5 categories * 100
+            score = int(np.sum(list(scores.values())))
+
+            # Display scorecard
+            st.markdown(f"**Aggregate Risk Score:** **{int(score / max_score * 100)} / 100**")
+            for name, value in scores.items():
+                st.write(f"- {name} score: {value} / 100")
 
         st.write("---")
         st.markdown("**Notes & sources:** This page uses balance-sheet, cashflow and pre-computed metrics fields from your uploaded dataset (e.g. `cashAndShortTermInvestments`, `totalDebt`, `netDebt`, liquidity & leverage ratios in `metrics` and `financial_metrics`, `operatingCashFlow`, `ebitda`, `interestPaid`, and `cashConversionCycle`). See mock_data.json for field examples. :contentReference[oaicite:3]{index=3} :contentReference[oaicite:4]{index=4} :contentReference[oaicite:5]{index=5}")
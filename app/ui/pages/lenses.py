@@ -2,75 +2,139 @@
 Lenses Page — Multi-period Income Statement Waterfalls
 """
 import streamlit as st
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from app.ui.base_page import BasePage
+from plotly.subplots import make_subplots
+from pandas.api.types import is_datetime64_any_dtype
+from app.ui.base_page import BasePage, page_cache_data, date_sorted
+
+
+# Line items that reduce income; plotted as negative steps in the waterfall
+_NEG_PREFIXES = ("cost", "expense", "selling", "research", "interestexpense", "incometax")
+
+
+@lru_cache(maxsize=None)
+def _field_sign(col: str) -> int:
+    """-1 for expense line items, 1 otherwise. Memoized, so each column name is normalized once per process."""
+    return -1 if col.lower().startswith(_NEG_PREFIXES) else 1
+
+
+@page_cache_data
+def _prepare_income(data_version, _df_is: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date-sorted income statement with parsed dates. Cached per data version,
+    so picking a period skips the sort and the datetime coercion.
+    """
+    df_is = date_sorted(_df_is)
+    if "date" in df_is.columns and not is_datetime64_any_dtype(df_is["date"]):
+        df_is["date"] = pd.to_datetime(df_is["date"], errors="coerce", cache=True)
+    return df_is
+
+
+def _yoy_waterfall(delta_vals, available_fields) -> go.Waterfall:
+    """
+    Create YoY change waterfall trace from one row of precomputed deltas,
+    given as a plain tuple positionally aligned with available_fields
+    (Δ = current - previous for each field; NaN where either period is
+    missing)
+    """
+    x = []
+    y = []
+    measures = []
+    net_delta = None
+
+    for (col, label), delta in zip(available_fields, delta_vals):
+        if pd.isna(delta):
+            continue
+        x.append(label.replace("-", "Δ "))  # label cleanup
+        y.append(delta)
+        measures.append("relative")
+        if col == "netIncome":
+            net_delta = delta
+
+    # Total: if netIncome exists
+    if net_delta is not None:
+        x.append("Δ Net Income (Final)")
+        y.append(net_delta)
+        measures.append("total")
+
+    return go.Waterfall(
+        name="YoY Change",
+        orientation="v",
+        measure=measures,
+        x=x,
+        y=y,
+        connector={"line": {"color": "rgb(100,100,100)"}}
+    )
+
+
+@page_cache_data
+def _yoy_grid_figure(data_version, _df_is: pd.DataFrame, available_fields, row_height=450) -> go.Figure:
+    """
+    One figure with a YoY waterfall subplot per consecutive period pair, so
+    the grid ships as a single chart. Cached per data version, so reruns skip
+    rebuilding it.
+    """
+    # All period-over-period deltas in one pass
+    deltas = _df_is[[col for col, _ in available_fields]].diff()
+    dates = _df_is["date"].dt.strftime("%Y-%m-%d").tolist()
+    rows = len(_df_is) - 1
+    fig = make_subplots(
+        rows=rows,
+        cols=1,
+        subplot_titles=[f"{dates[i]} vs {dates[i-1]}" for i in range(1, len(_df_is))],
+    )
+    delta_rows = deltas.itertuples(index=False, name=None)
+    next(delta_rows)  # the first period has no predecessor
+    for i, delta_vals in enumerate(delta_rows, start=1):
+        fig.add_trace(_yoy_waterfall(delta_vals, available_fields), row=i, col=1)
+        fig.update_yaxes(title_text="Δ Amount (YoY)", row=i, col=1)
+
+    fig.update_layout(
+        title="YoY Change Waterfalls",
+        height=row_height * rows,
+        showlegend=False,
+        margin=dict(l=40, r=40, t=80, b=40),
+    )
+    return fig
 
 
 class LensesPage(BasePage):
-    def build_yoy_waterfall(self, df_row_now, df_row_prev, available_fields, height=450):
+    @st.fragment
+    def render_period_waterfall(self, df_is, available_fields, signs):
         """
-        Create YoY change waterfall:
-        Δ = current - previous for each available field
+        Period picker and its waterfall. Runs as a fragment, so changing the
+        period reruns only this panel instead of every page in the app.
         """
-        x = []
-        y = []
-        measures = []
-
-        for col, label in available_fields:
-            now_val = df_row_now.get(col, None)
-            prev_val = df_row_prev.get(col, None)
-
-            if (now_val is None or pd.isna(now_val)) or (prev_val is None or pd.isna(prev_val)):
-                continue
-
-            delta = now_val - prev_val
-
-            x.append(label.replace("-", "Δ "))  # label cleanup
-            y.append(delta)
-            measures.append("relative")
-
-        # Total: if netIncome exists
-        if "netIncome" in df_row_now and not pd.isna(df_row_now["netIncome"]) and not pd.isna(df_row_prev["netIncome"]):
-            net_delta = df_row_now["netIncome"] - df_row_prev["netIncome"]
-            x.append("Δ Net Income (Final)")
-            y.append(net_delta)
-            measures.append("total")
+        # Let the user pick a period, or cycle through all
+        st.subheader("Select reporting period")
+        dates = df_is["date"].dt.strftime("%Y-%m-%d").tolist()
+        period_idx = st.selectbox(
+            "Choose a date",
+            range(len(dates)),
+            index=len(dates) - 1,
+            format_func=dates.__getitem__,
+        )
+        period = dates[period_idx]
 
-        fig = go.Figure(go.Waterfall(
-            name="YoY Change",
-            orientation="v",
-            measure=measures,
-            x=x,
-            y=y,
-            connector={"line": {"color": "rgb(100,100,100)"}}
-        ))
+        df_single = df_is.iloc[period_idx]
 
-        fig.update_layout(
-            title="YoY Change Waterfall",
-            height=height,
-            showlegend=False,
-            margin=dict(l=40, r=40, t=60, b=40),
-            xaxis_title="Line Item",
-            yaxis_title="Δ Amount (YoY)"
-        )
+        st.write(f"### Income Statement Waterfall for {period}")
 
-        return fig
+        fig = self.build_income_statement_waterfall(df_single, available_fields, signs)
+        st.plotly_chart(fig, use_container_width=True)
 
     def render(self):
         st.header("Lenses — Income Statement Breakdowns")
 
         # Load the income statement
-        df_is = pd.DataFrame(self.state.income_statement_df)
+        df_is = _prepare_income(self.state.data_source, self.state.income_statement_df)
         if df_is.empty:
             st.warning("No income_statement data found.")
             return
 
-        # sort chronologically
-        df_is = df_is.sort_values("date")
-        df_is["date"] = pd.to_datetime(df_is["date"])
-
         st.write("""
         This page provides **Income Statement waterfall plots** for every reporting period available.
         
@@ -99,19 +163,10 @@ class LensesPage(BasePage):
 
         available_fields = [(col, label) for col, label in field_order if col in df_is.columns]
 
-        # Let the user pick a period, or cycle through all
-        st.subheader("Select reporting period")
-        period = st.selectbox(
-            "Choose a date",
-            df_is["date"].dt.strftime("%Y-%m-%d").tolist()
-        )
-
-        df_single = df_is[df_is["date"] == pd.to_datetime(period)].iloc[0]
+        # Waterfall direction per field, fixed for the dataset
+        signs = np.array([_field_sign(col) for col, _ in available_fields])
 
-        st.write(f"### Income Statement Waterfall for {period}")
-
-        fig = self.build_income_statement_waterfall(df_single, available_fields)
-        st.plotly_chart(fig, use_container_width=True)
+        self.render_period_waterfall(df_is, available_fields, signs)
 
         st.write("---")
 
@@ -121,58 +176,37 @@ class LensesPage(BasePage):
         st.subheader("All Periods — YoY Change Waterfall Grid")
 
         st.write("""
-        Each chart shows how **each income statement line item moved vs the previous period**.
+        Each panel shows how **each income statement line item moved vs the previous period**.
         Positive = favorable change, Negative = deterioration.
         """)
 
         if len(df_is) < 2:
             st.info("Need at least 2 periods to compute YoY changes.")
         else:
-            for i in range(1, len(df_is)):
-                now_row = df_is.iloc[i]
-                prev_row = df_is.iloc[i-1]
-
-                date_now = now_row["date"].strftime("%Y-%m-%d")
-                date_prev = prev_row["date"].strftime("%Y-%m-%d")
-
-                st.markdown(f"### {date_now} vs {date_prev}")
-
-                fig_yoy = self.build_yoy_waterfall(now_row, prev_row, available_fields)
-                st.plotly_chart(fig_yoy)
-
-                st.write("---")
+            fig_yoy = _yoy_grid_figure(self.state.data_source, df_is, available_fields)
+            st.plotly_chart(fig_yoy, use_container_width=True)
 
 
     # ------------------------------------------------------------------
     # Build waterfall helper function
     # ------------------------------------------------------------------
-    def build_income_statement_waterfall(self, row, available_fields, height=500):
+    def build_income_statement_waterfall(self, row, available_fields, signs, height=500):
         """
         Generate a Plotly waterfall for one reporting date.
-        Only includes fields that exist in dataset.
+        Only includes fields that exist in dataset; signs holds -1 (expense,
+        plotted as a negative step) or 1 per field in available_fields.
         """
-        x = []
-        y = []
-        measures = []
-
-        # Build step-by-step
-        running_total = 0
-
-        for col, label in available_fields:
-            val = row.get(col, None)
-            if val is None or pd.isna(val):
-                continue
-
-            # For negative items, ensure waterfall direction is correct:
-            if col.lower().startswith(("cost", "expense", "selling", "research", "interestexpense", "incometax")):
-                # treat as negative contribution
-                delta = -abs(val)
-            else:
-                delta = val
-
-            x.append(label)
-            y.append(delta)
-            measures.append("relative")
+        cols = [col for col, _ in available_fields]
+        labels = np.array([label for _, label in available_fields], dtype=object)
+        vals = row.reindex(cols).to_numpy(dtype=float)
+        present = ~np.isnan(vals)
+
+        # For negative items, ensure waterfall direction is correct:
+        steps = np.where(signs < 0, -np.abs(vals), vals)
+
+        x = labels[present].tolist()
+        y = steps[present].tolist()
+        measures = ["relative"] * len(x)
 
         # Add final total if netIncome exists
         if "netIncome" in row and not pd.isna(row["netIncome"]):
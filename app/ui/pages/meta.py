@@ -1,12 +1,170 @@
 """
 Valuation Playground Page (Modular FCF, 1-10 years, docs + charts)
 """
+import json
 import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, date_sorted
+
+
+# Scenario presets: (FCF scale, WACC scale, WACC floor, WACC cap, terminal g scale)
+_SCENARIOS = {
+    "conservative": (0.9, 1.15, 0.0, 0.4, 0.7),
+    "base": (1.0, 1.0, 0.0, np.inf, 1.0),
+    "optimistic": (1.12, 0.9, 0.02, np.inf, 1.3),
+}
+
+
+@page_cache_data
+def _extract_seed_fcf(data_version, _df_metrics: pd.DataFrame, _df_cash: pd.DataFrame):
+    """
+    Latest metrics.freeCashFlowToFirm, else latest cashflow.freeCashFlow, else
+    None. Cached per data version.
+    """
+    seed_fcf = None
+    if _df_metrics is not None and not _df_metrics.empty and "freeCashFlowToFirm" in _df_metrics.columns:
+        try:
+            seed_fcf = float(date_sorted(_df_metrics).iloc[-1]["freeCashFlowToFirm"])
+        except Exception:
+            seed_fcf = None
+    if seed_fcf is None and _df_cash is not None and not _df_cash.empty and "freeCashFlow" in _df_cash.columns:
+        try:
+            seed_fcf = float(date_sorted(_df_cash).iloc[-1]["freeCashFlow"])
+        except Exception:
+            seed_fcf = None
+    return seed_fcf
+
+
+def _inv_discount_factors(wacc_vals: np.ndarray, proj_years: int) -> np.ndarray:
+    """
+    1 / (1+wacc)^1..N for each WACC, one row per rate. Built by running
+    product (N-1 multiplications instead of N powers) and inverted once, so
+    the headline DCF and the sensitivity grid only ever multiply.
+    """
+    return 1.0 / np.cumprod(np.repeat(1.0 + wacc_vals[:, None], proj_years, axis=1), axis=1)
+
+
+@page_cache_data
+def _dcf_core(fcfs: tuple, wacc: float, term_g, term_mult, proj_years: int) -> tuple:
+    """
+    (PV of each projected FCF, PV of terminal, enterprise value). The terminal
+    is a growing perpetuity when term_g is given, else FCF x term_mult.
+    """
+    FCFs = np.array(fcfs, dtype=float)
+    inv_discount = _inv_discount_factors(np.array([wacc]), proj_years)[0]
+    pv_fcfs = FCFs * inv_discount
+
+    # terminal value
+    if term_g is not None:
+        terminal_fcf = FCFs[-1] * (1 + term_g)
+        terminal_value = terminal_fcf / (wacc - term_g)
+    else:
+        terminal_value = FCFs[-1] * term_mult
+
+    pv_terminal = terminal_value * inv_discount[-1]
+
+    return pv_fcfs, pv_terminal, pv_fcfs.sum() + pv_terminal
+
+
+def _dcf_grid(FCFs: np.ndarray, wacc_vals: np.ndarray, g_vals: np.ndarray, is_perpetuity: bool) -> np.ndarray:
+    """
+    Enterprise value for every (terminal assumption, WACC) pair in one
+    broadcast: rows follow g_vals, columns wacc_vals. g_vals are growth rates
+    for a perpetuity, else terminal multiples. Cells where WACC <= g are NaN.
+    """
+    W = wacc_vals[None, :]
+    G = g_vals[:, None]
+    # one row of discount reciprocals per WACC, shared by every g
+    inv_discount = _inv_discount_factors(wacc_vals, len(FCFs))
+    # PV per WACC as one matrix-vector product (a dot per row), no temporary grid
+    pv_sum = inv_discount @ FCFs
+    if is_perpetuity:
+        # terminal as perpetuity, undefined where WACC <= g
+        with np.errstate(divide="ignore", invalid="ignore"):
+            term = np.where(W <= G, np.nan, FCFs[-1] * (1 + G) / (W - G))
+    else:
+        # treat gval as terminal multiple
+        term = FCFs[-1] * G
+    return pv_sum[None, :] + term * inv_discount[None, :, -1]
+
+
+@page_cache_data
+def _dcf_sensitivity(fcfs: tuple, wacc: float, term_g, term_mult, proj_years: int) -> pd.DataFrame:
+    """
+    Enterprise value over a 3x3 grid around the chosen WACC and terminal
+    assumption (g +/- 1pt for a perpetuity, multiple +/- 10% otherwise).
+    Cells where WACC <= g are NaN.
+    """
+    FCFs = np.array(fcfs, dtype=float)
+
+    # generate small grids around chosen WACC and terminal g
+    wacc_vals = np.array([wacc * 0.95, wacc, wacc * 1.05])
+    if term_g is not None:
+        g_base = term_g
+        g_vals = np.array([g_base - 0.01, g_base, g_base + 0.01])
+    else:
+        # if terminal multiple, vary multiple a bit
+        mult_base = term_mult
+        g_vals = np.array([mult_base * 0.9, mult_base, mult_base * 1.1])
+
+    grid = _dcf_grid(FCFs, wacc_vals, g_vals, term_g is not None)
+
+    sens_df = pd.DataFrame(grid, index=[f"{g:.2%}" for g in g_vals], columns=[f"{w:.2%}" for w in wacc_vals])
+
+    return sens_df
+
+
+@page_cache_data
+def _dcf_figures(fcfs: tuple, wacc: float, term_g, term_mult, proj_years: int) -> dict:
+    """
+    Projection, PV waterfall and combined PV charts as Plotly JSON, keyed by
+    name. Cached on the DCF inputs, so unrelated widget reruns skip building
+    and serializing the figures.
+    """
+    FCFs = np.array(fcfs, dtype=float)
+    years = np.arange(1, proj_years + 1)
+    pv_fcfs, pv_terminal, _ = _dcf_core(fcfs, wacc, term_g, term_mult, proj_years)
+
+    # projection line + bar
+    fig_proj = go.Figure()
+    # both traces share the same year/FCF arrays
+    fig_proj.add_trace(go.Bar(x=years, y=FCFs, name="FCF (nominal)"))
+    fig_proj.add_trace(go.Scatter(x=years, y=FCFs, mode="lines", name="FCF (trend)", yaxis="y1",
+                                  line=dict(dash="dash")))
+    fig_proj.update_layout(title="Projected FCF (nominal)", xaxis_title="Year", yaxis_title="FCF")
+
+    # PV waterfall: each PV of FCF as relative, terminal as total (final)
+    waterfall_y = list(pv_fcfs)
+    waterfall_measure = ["relative"] * len(pv_fcfs)
+    labels = [f"Y{yr}" for yr in years]
+
+    # append terminal as a total
+    waterfall_y.append(pv_terminal)
+    waterfall_measure.append("total")
+    labels.append("Terminal (PV)")
+
+    fig_wf = go.Figure(go.Waterfall(
+        name="DCF PV",
+        orientation="v",
+        measure=waterfall_measure,
+        x=labels,
+        y=waterfall_y,
+        connector={"line": {"color": "rgb(120,120,120)"}},
+        decreasing={"marker": {"color": "firebrick"}},
+        increasing={"marker": {"color": "forestgreen"}},
+        totals={"marker": {"color": "blue"}}
+    ))
+    fig_wf.update_layout(title="DCF PV Waterfall (contribution of each year's discounted cash flows)", xaxis_title="", yaxis_title="USD")
+
+    # Combined chart: PV(FCF) stacked bars + PV Terminal overlay line
+    fig_comb = go.Figure()
+    fig_comb.add_trace(go.Bar(x=years, y=pv_fcfs, name="PV(FCF)"))
+    fig_comb.add_trace(go.Bar(x=[proj_years + 1], y=[pv_terminal], name="PV(Terminal)"))
+    fig_comb.update_layout(title="PV contributions: Years + Terminal", xaxis_title="Year / Terminal", yaxis_title="PV (USD)", barmode="stack")
+
+    return {"proj": fig_proj.to_json(), "wf": fig_wf.to_json(), "comb": fig_comb.to_json()}
 
 
 class ValuationProblemsPage(BasePage):
@@ -20,6 +178,9 @@ class ValuationProblemsPage(BasePage):
       - Inline documentation and link to the uploaded dataset
     """
 
+    # The whole playground is interactive, so it runs as a fragment: editing
+    # an input reruns this page only, not every other tab in the app.
+    @st.fragment
     def render(self):
         st.title("Valuation Playground — Modular DCF & Dividend Models")
         st.markdown(
@@ -42,21 +203,9 @@ class ValuationProblemsPage(BasePage):
         # ------------------------------
         # Data seed (attempt to pull seed FCF from uploaded data)
         # ------------------------------
-        df_metrics = pd.DataFrame(self.state.metrics_df.sort_values("date")) if self.state.metrics_df is not None else pd.DataFrame()
-        df_cash = pd.DataFrame(self.state.cashflow_df.sort_values("date")) if self.state.cashflow_df is not None else pd.DataFrame()
         st.caption("This playground will attempt to use `metrics.freeCashFlowToFirm` or `cashflow.freeCashFlow` as the seed FCF if available.")
 
-        seed_fcf = None
-        if not df_metrics.empty and "freeCashFlowToFirm" in df_metrics.columns:
-            try:
-                seed_fcf = float(df_metrics.iloc[-1]["freeCashFlowToFirm"])
-            except Exception:
-                seed_fcf = None
-        if seed_fcf is None and not df_cash.empty and "freeCashFlow" in df_cash.columns:
-            try:
-                seed_fcf = float(df_cash.iloc[-1]["freeCashFlow"])
-            except Exception:
-                seed_fcf = None
+        seed_fcf = _extract_seed_fcf(self.state.data_source, self.state.metrics_df, self.state.cashflow_df)
 
         # ------------------------------
         # User inputs: DCF horizon and base settings
@@ -68,17 +217,20 @@ class ValuationProblemsPage(BasePage):
 
         # dynamic FCF input grid
         st.write("Enter Free Cash Flow (FCF) for each projected year (units: same as dataset):")
-        # create columns across the screen for compact layout
-        cols = st.columns(5)
-        fcf_inputs = []
+        # one editor for the whole horizon: an edit (or a pasted column) is a single rerun
         default_base = seed_fcf if seed_fcf is not None else 50.0
-        for i in range(proj_years):
-            col = cols[i % 5]
-            default_val = float(default_base * (1 + 0.05 * i)) if seed_fcf is not None else float(default_base + i * 5)
-            val = col.number_input(f"FCF Y{i+1}", key=f"fcf_{i+1}", value=round(default_val, 2), step=0.1)
-            fcf_inputs.append(float(val))
-
-        FCFs = np.array(fcf_inputs, dtype=float)
+        steps = np.arange(proj_years)
+        if seed_fcf is not None:
+            defaults = default_base * (1 + 0.05 * steps)
+        else:
+            defaults = default_base + steps * 5
+        fcf_df = pd.DataFrame({"FCF": defaults.round(2)}, index=[f"Y{i + 1}" for i in steps])
+        edited = st.data_editor(
+            fcf_df,
+            num_rows="fixed",
+            column_config={"FCF": st.column_config.NumberColumn("FCF", step=0.1, required=True)},
+        )
+        FCFs = edited["FCF"].to_numpy(dtype=np.float64, na_value=0.0)
 
         st.write("---")
         st.header("2) Discount & Terminal Settings")
@@ -106,29 +258,32 @@ class ValuationProblemsPage(BasePage):
                 fcf_margin = st.number_input("FCF margin (FCF / Revenue %)", value=0.05, step=0.01) / 100.0
                 # optional: if user toggles, override FCFs with margin-derived
                 if st.button("Apply margin -> FCF for projection"):
-                    for i in range(proj_years):
-                        FCFs[i] = revenue * (1 + 0.03) ** (i + 1) * fcf_margin
+                    FCFs = revenue * (1 + 0.03) ** np.arange(1, proj_years + 1) * fcf_margin
                     st.success("FCF overwritten with margin-driven projection.")
 
         st.write("---")
         st.header("3) Scenario Presets (one-click) — Mild scenarios")
 
         sc1, sc2, sc3 = st.columns(3)
+        # the chosen preset persists across reruns, so later edits keep hitting the cached DCF
         if sc1.button("Conservative"):
-            # damp growth and increase WACC
-            FCFs = FCFs * 0.9
-            wacc = min(wacc * 1.15, 0.4)
-            if term_g is not None:
-                term_g = term_g * 0.7
-            st.success("Conservative scenario applied.")
+            st.session_state["dcf_scenario"] = "conservative"
         if sc2.button("Base"):
-            st.info("Base scenario: no change.")
+            st.session_state["dcf_scenario"] = "base"
         if sc3.button("Optimistic"):
-            FCFs = FCFs * 1.12
-            wacc = max(wacc * 0.9, 0.02)
+            st.session_state["dcf_scenario"] = "optimistic"
+        scenario = st.session_state.get("dcf_scenario", "base")
+
+        # conservative damps growth and raises WACC, optimistic the reverse
+        fcf_adj, wacc_adj, wacc_lo, wacc_hi, g_adj = _SCENARIOS[scenario]
+        if scenario != "base":
+            FCFs = FCFs * fcf_adj
+            wacc = float(np.clip(wacc * wacc_adj, wacc_lo, wacc_hi))
             if term_g is not None:
-                term_g = term_g * 1.3
-            st.success("Optimistic scenario applied.")
+                term_g = term_g * g_adj
+            st.success(f"{scenario.capitalize()} scenario applied.")
+        elif "dcf_scenario" in st.session_state:
+            st.info("Base scenario: no change.")
 
         st.write("---")
 
@@ -140,20 +295,8 @@ class ValuationProblemsPage(BasePage):
         if wacc <= (term_g if term_g is not None else -np.inf):
             st.error("WACC must exceed terminal growth g for a valid perpetuity terminal value.")
         else:
-            years = np.arange(1, proj_years + 1)
-            discount_factors = (1 + wacc) ** years
-            pv_fcfs = FCFs / discount_factors
-
-            # terminal value
-            if terminal_method == "Perpetuity (g)":
-                terminal_fcf = FCFs[-1] * (1 + term_g)
-                terminal_value = terminal_fcf / (wacc - term_g)
-            else:
-                terminal_value = FCFs[-1] * term_mult
-
-            pv_terminal = terminal_value / ((1 + wacc) ** proj_years)
-
-            EV_dcf = pv_fcfs.sum() + pv_terminal
+            fcf_key = tuple(FCFs.tolist())
+            pv_fcfs, pv_terminal, EV_dcf = _dcf_core(fcf_key, wacc, term_g, term_mult, proj_years)
 
             st.subheader("Numeric Results")
             st.write(f"- PV of projected FCF (years 1..{proj_years}): **${pv_fcfs.sum():,.2f}**")
@@ -179,50 +322,10 @@ class ValuationProblemsPage(BasePage):
             st.write("---")
             st.subheader("Charts: FCF Projection & PV Waterfall")
 
-            # projection line + bar
-            df_proj = pd.DataFrame({
-                "year": years,
-                "FCF": FCFs,
-                "PV(FCF)": pv_fcfs
-            })
-
-            fig_proj = go.Figure()
-            fig_proj.add_trace(go.Bar(x=df_proj["year"], y=df_proj["FCF"], name="FCF (nominal)"))
-            fig_proj.add_trace(go.Line(x=df_proj["year"], y=df_proj["FCF"], name="FCF (trend)", yaxis="y1",
-                                       line=dict(dash="dash")))
-            fig_proj.update_layout(title="Projected FCF (nominal)", xaxis_title="Year", yaxis_title="FCF")
-            st.plotly_chart(fig_proj, use_container_width=True)
-
-            # PV waterfall: each PV of FCF as relative, terminal as total (final)
-            waterfall_y = list(pv_fcfs)
-            waterfall_measure = ["relative"] * len(pv_fcfs)
-            labels = [f"Y{yr}" for yr in years]
-
-            # append terminal as a total
-            waterfall_y.append(pv_terminal)
-            waterfall_measure.append("total")
-            labels.append("Terminal (PV)")
-
-            fig_wf = go.Figure(go.Waterfall(
-                name="DCF PV",
-                orientation="v",
-                measure=waterfall_measure,
-                x=labels,
-                y=waterfall_y,
-                connector={"line": {"color": "rgb(120,120,120)"}},
-                decreasing={"marker": {"color": "firebrick"}},
-                increasing={"marker": {"color": "forestgreen"}},
-                totals={"marker": {"color": "blue"}}
-            ))
-            fig_wf.update_layout(title="DCF PV Waterfall (contribution of each year's discounted cash flows)", xaxis_title="", yaxis_title="USD")
-            st.plotly_chart(fig_wf, use_container_width=True)
-
-            # Combined chart: PV(FCF) stacked bars + PV Terminal overlay line
-            fig_comb = go.Figure()
-            fig_comb.add_trace(go.Bar(x=df_proj["year"], y=df_proj["PV(FCF)"], name="PV(FCF)"))
-            fig_comb.add_trace(go.Bar(x=[proj_years + 1], y=[pv_terminal], name="PV(Terminal)"))
-            fig_comb.update_layout(title="PV contributions: Years + Terminal", xaxis_title="Year / Terminal", yaxis_title="PV (USD)", barmode="stack")
-            st.plotly_chart(fig_comb, use_container_width=True)
+            figs = _dcf_figures(fcf_key, wacc, term_g, term_mult, proj_years)
+            st.plotly_chart(json.loads(figs["proj"]), use_container_width=True)
+            st.plotly_chart(json.loads(figs["wf"]), use_container_width=True)
+            st.plotly_chart(json.loads(figs["comb"]), use_container_width=True)
 
             # ------------------------------
             # Sensitivity matrix (small)
@@ -230,40 +333,7 @@ class ValuationProblemsPage(BasePage):
             st.write("---")
             st.subheader("Sensitivity: WACC vs Terminal growth (small grid)")
 
-            # generate small grids around chosen WACC and terminal g
-            wacc_vals = np.array([wacc * 0.95, wacc, wacc * 1.05])
-            if terminal_method == "Perpetuity (g)":
-                g_base = term_g
-                g_vals = np.array([g_base - 0.01, g_base, g_base + 0.01])
-            else:
-                # if terminal multiple, vary multiple a bit
-                mult_base = term_mult
-                g_vals = np.array([mult_base * 0.9, mult_base, mult_base * 1.1])
-
-            sens_index = []
-            sens_cols = []
-            sens_df = pd.DataFrame(index=[f"{g:.2%}" for g in g_vals], columns=[f"{w:.2%}" for w in wacc_vals])
-
-            for w in wacc_vals:
-                for idx, gval in enumerate(g_vals):
-                    if terminal_method == "Perpetuity (g)":
-                        if w <= gval:
-                            sens_df.at[f"{gval:.2%}", f"{w:.2%}"] = np.nan
-                        else:
-                            # compute pv with these params (terminal as perpetuity)
-                            discount_factors_local = (1 + w) ** years
-                            pv_local = (FCFs / discount_factors_local).sum()
-                            term_fcf_local = FCFs[-1] * (1 + gval)
-                            term_local = term_fcf_local / (w - gval)
-                            pv_term_local = term_local / ((1 + w) ** proj_years)
-                            sens_df.at[f"{gval:.2%}", f"{w:.2%}"] = pv_local + pv_term_local
-                    else:
-                        # treat gval as terminal multiple
-                        discount_factors_local = (1 + w) ** years
-                        pv_local = (FCFs / discount_factors_local).sum()
-                        term_local = FCFs[-1] * gval
-                        pv_term_local = term_local / ((1 + w) ** proj_years)
-                        sens_df.at[f"{gval:.2%}", f"{w:.2%}"] = pv_local + pv_term_local
+            sens_df = _dcf_sensitivity(fcf_key, wacc, term_g, term_mult, proj_years)
 
             # format sens_df nicely
             st.dataframe(sens_df.style.format("${:,.0f}"))
@@ -2,7 +2,73 @@
 Narrative Generator Page
 """
 import streamlit as st
-from app.ui.base_page import BasePage
+import pandas as pd
+from app.ui.base_page import BasePage, page_cache_data
+
+
+# Narrative sentences in output order, each behind the gate that decides
+# whether its inputs are present
+_TEMPLATES = (
+    ('header', "Executive summary — Fiscal Year {year}:"),
+    ('cash', "{company} generated {fcf} of free cash flow in the latest fiscal year, with operating cash flow of {ocf} and net income of {net_income}."),
+    ('conversion', "Cash conversion (OCF / Net Income) was {ocf_ratio:.2f}x, indicating {quality} earnings quality."),
+    ('payout', "Management returned {payout_pct:.1f}% of FCF to shareholders via buybacks and dividends in the year."),
+    ('net_debt', "Net debt stands at {net_debt}."),
+    ('wc_out', "Working capital change was a headwind to cash flow of {delta_wc} (cash outflow)."),
+    ('wc_in', "Working capital supported cash flow by {delta_wc} (cash inflow)."),
+    ('capex', "Capital expenditure was {capex}, representing {capex_pct:.2f}% of revenue."),
+)
+
+
+@page_cache_data
+def _build_narrative(data_version, symbol: str, _frames: tuple, _service) -> str:
+    """
+    Narrative text for the latest fiscal year of the derived metrics
+    (FinancialDataService.compute_metrics over the loaded statements).
+    Cached per data version, so reruns while the user edits the text area
+    skip regenerating it.
+    """
+    df_income, df_balance, df_cash, df_metrics = _frames
+    # compute_metrics writes fiscalYear into its inputs; keep the state frames untouched
+    derived = _service.compute_metrics(*(df.copy(deep=False) for df in _frames))
+    latest = (derived if not derived.empty else df_metrics).iloc[-1].to_dict()
+    fmt = _service.format_b
+    fcf, ocf, net_income = latest.get('freeCashFlow'), latest.get('operatingCashFlow'), latest.get('netIncome')
+    ocf_ratio = latest.get('OCF_to_NetIncome')
+    payout = latest.get('payout_pct_of_FCF')
+    net_debt = latest.get('netDebt')
+    delta_wc = latest.get('changeInWorkingCapital')
+    capex, capex_to_revenue = latest.get('capitalExpenditure'), latest.get('capex_to_revenue')
+
+    has_wc = pd.notna(delta_wc)
+    gates = {
+        'header': True,
+        'cash': pd.notna(fcf) and pd.notna(ocf) and pd.notna(net_income),
+        'conversion': pd.notna(ocf_ratio),
+        'payout': pd.notna(payout),
+        'net_debt': pd.notna(net_debt),
+        'wc_out': has_wc and delta_wc < 0,
+        'wc_in': has_wc and not delta_wc < 0,
+        'capex': pd.notna(capex) and pd.notna(capex_to_revenue),
+    }
+    # only values behind an open gate are formatted
+    ctx = {'year': int(latest['fiscalYear']), 'company': symbol or latest.get('symbol') or 'The company'}
+    if gates['cash']:
+        ctx.update(fcf=fmt(fcf), ocf=fmt(ocf), net_income=fmt(net_income))
+    if gates['conversion']:
+        ctx.update(ocf_ratio=ocf_ratio, quality='strong' if ocf_ratio > 1.0 else 'weaker')
+    if gates['payout']:
+        ctx['payout_pct'] = payout * 100
+    if gates['net_debt']:
+        ctx['net_debt'] = fmt(net_debt)
+    if has_wc:
+        ctx['delta_wc'] = fmt(delta_wc)
+    if gates['capex']:
+        ctx.update(capex=fmt(abs(capex)), capex_pct=abs(capex_to_revenue) * 100)
+    lines = [template.format_map(ctx) for gate, template in _TEMPLATES if gates[gate]]
+
+    return '\n'.join(lines)
+
 
 class NarrativeGeneratorPage(BasePage):
     def render(self):
@@ -13,27 +79,15 @@ class NarrativeGeneratorPage(BasePage):
             st.info('Upload data to generate a narrative.')
             return
 
-        latest = self.state.metrics_df.iloc[-1]
-        lines = []
-        lines.append(f"Executive summary — Fiscal Year {int(latest['fiscalYear'])}:")
-        # lines.append(f"Apple generated {self.service.format_b(latest['freeCashFlow'])} of free cash flow in the latest fiscal year, with operating cash flow of {self.service.format_b(latest['operatingCashFlow'])} and net income of {self.service.format_b(latest['netIncome'])}.")
-        # ocf_ratio = latest['OCF_to_NetIncome']
-        # if ocf_ratio is not None:
-        #     lines.append(f"Cash conversion (OCF / Net Income) was {ocf_ratio:.2f}x, indicating {'strong' if ocf_ratio>1.0 else 'weaker'} earnings quality.")
-        # if 'payout_pct_of_FCF' in latest and latest['payout_pct_of_FCF'] is not None:
-        #     lines.append(f"Management returned {latest['payout_pct_of_FCF']*100:.1f}% of FCF to shareholders via buybacks and dividends in the year.")
-        # if 'netDebt' in latest and latest['netDebt'] is not None:
-        #     lines.append(f"Net debt stands at {self.service.format_b(latest['netDebt'])}.")
-        # if 'changeInWorkingCapital' in latest and latest['changeInWorkingCapital'] is not None:
-        #     delta_wc = latest['changeInWorkingCapital']
-        #     if delta_wc < 0:
-        #         lines.append(f"Working capital change was a headwind to cash flow of {self.service.format_b(delta_wc)} (cash outflow).")
-        #     else:
-        #         lines.append(f"Working capital supported cash flow by {self.service.format_b(delta_wc)} (cash inflow).")
-        # if 'capitalExpenditure' in latest and latest['capitalExpenditure'] is not None:
-        #     lines.append(f"Capital expenditure was {self.service.format_b(latest['capitalExpenditure'])}, representing {latest['capex_to_revenue']*100:.2f}% of revenue (if revenue data provided)." )
-        # lines.append('Key risks include sustained increases in working capital requirements, larger-than-expected capex, or slowing revenue growth which would reduce FCF. Upside comes from margin expansion or services growth.')
-
-        narrative = ' '.join(lines)
+        frames = tuple(
+            df if df is not None else pd.DataFrame()
+            for df in (
+                self.state.income_statement_df,
+                self.state.balance_sheet_df,
+                self.state.cashflow_df,
+                self.state.metrics_df,
+            )
+        )
+        narrative = _build_narrative(self.state.data_source, self.state.symbol, frames, self.service)
         narrative = st.text_area('Auto-generated narrative (editable)', value=narrative, height=300)
         st.download_button('Download narrative', data=narrative, file_name='aapl_narrative.txt', mime='text/plain')
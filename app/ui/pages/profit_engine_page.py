@@ -1,11 +1,76 @@
 """
 Profit Engine Page
 """
+import json
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, STATIC_CHART_CONFIG, date_sorted, band_insights
+
+# Ratio columns compared year over year, with (improved, not improved) messages
+_TREND_COLS = ("grossProfitMargin", "operatingProfitMargin", "inventoryTurnover")
+_TREND_MESSAGES = (
+    ("• Gross margin expanded year-over-year.", "• Gross margin declined year-over-year."),
+    ("• Operating margin improving — positive operating leverage.", "• Operating margin weakening — cost pressures increasing."),
+    ("• Inventory turnover improved — better working capital efficiency.", None),
+)
+_REVENUE_MESSAGES = (("• Strong revenue acceleration (>5% YoY).", "• Revenue contracted year-over-year."),)
+
+
+@page_cache_data
+def _build_figures(data_version, _df_income, _df_fin) -> dict:
+    """
+    Revenue, operating income and margin charts as Plotly JSON, keyed by
+    name. Cached per data version, so widget reruns skip figure construction
+    and serialization.
+    """
+    df_income, df_fin = _df_income, _df_fin
+    figs = {}
+
+    # Revenue Trend
+    figs["rev"] = px.line(
+        df_income,
+        x="date",
+        y="revenue",
+        title="Revenue (5-Year Trend)",
+        markers=True
+    )
+
+    # Operating Income Trend
+    figs["op"] = px.line(
+        df_income,
+        x="date",
+        y="operatingIncome",
+        title="Operating Income Trend",
+        markers=True
+    )
+
+    margin_labels = {
+        "grossProfitMargin": "Gross Margin",
+        "operatingProfitMargin": "Operating Margin",
+        "netProfitMargin": "Net Margin",
+    }
+    margins_long = df_fin.melt(
+        id_vars="date",
+        value_vars=list(margin_labels),
+        var_name="Margin",
+        value_name="pct"
+    )
+    margins_long["Margin"] = margins_long["Margin"].map(margin_labels)
+    # Single broadcast multiply over the float64 column
+    margins_long["pct"] = margins_long["pct"] * 100
+
+    figs["margin"] = px.bar(
+        margins_long,
+        x="date",
+        y="pct",
+        color="Margin",
+        barmode="group",
+        title="Margin Comparison Over Time (%)"
+    )
+
+    return {name: fig.to_json() for name, fig in figs.items()}
+
 
 class ProfitEnginePage(BasePage):
 
@@ -15,16 +80,14 @@ class ProfitEnginePage(BasePage):
         # -----------------------------
         # LOAD DATA
         # -----------------------------
-        df_income = pd.DataFrame(self.state.income_statement_df)
-        df_fin = pd.DataFrame(self.state.financials_df)
-
-        # Sort by date
-        df_income.sort_values("date", inplace=True)
-        df_fin.sort_values("date", inplace=True)
+        df_income = date_sorted(self.state.income_statement_df)
+        df_fin = date_sorted(self.state.financials_df)
 
         latest_income = df_income.iloc[-1]
         latest_fin = df_fin.iloc[-1]
 
+        figs = _build_figures(self.state.data_source, df_income, df_fin)
+
         st.write("### Revenue & Profitability Trends")
 
         # -----------------------------
@@ -34,53 +97,18 @@ class ProfitEnginePage(BasePage):
 
         # Revenue Trend
         with col1:
-            fig_rev = px.line(
-                df_income,
-                x="date",
-                y="revenue",
-                title="Revenue (5-Year Trend)",
-                markers=True
-            )
-            st.plotly_chart(fig_rev, width='content')
+            st.plotly_chart(json.loads(figs["rev"]), width='content')
 
         # Operating Income Trend
         with col2:
-            fig_op = px.line(
-                df_income,
-                x="date",
-                y="operatingIncome",
-                title="Operating Income Trend",
-                markers=True
-            )
-            st.plotly_chart(fig_op, width='content')
+            st.plotly_chart(json.loads(figs["op"]), width='content')
 
         # -----------------------------
         # MARGIN STACK (WATERFALL BAR)
         # -----------------------------
         st.write("### Margin Stack (Gross → Operating → Net)")
 
-        margin_fig = go.Figure(data=[
-            go.Bar(
-                name="Gross Margin",
-                x=df_fin["date"],
-                y=df_fin["grossProfitMargin"] * 100
-            ),
-            go.Bar(
-                name="Operating Margin",
-                x=df_fin["date"],
-                y=df_fin["operatingProfitMargin"] * 100
-            ),
-            go.Bar(
-                name="Net Margin",
-                x=df_fin["date"],
-                y=df_fin["netProfitMargin"] * 100
-            )
-        ])
-        margin_fig.update_layout(
-            barmode='group',
-            title="Margin Comparison Over Time (%)"
-        )
-        st.plotly_chart(margin_fig)
+        st.plotly_chart(json.loads(figs["margin"]), config=STATIC_CHART_CONFIG)
 
         # -----------------------------
         # OPERATIONAL EFFICIENCY
@@ -118,30 +146,31 @@ class ProfitEnginePage(BasePage):
         # -----------------------------
         st.write("### Unit Economics")
 
-        latest_rev = latest_income["revenue"]
-        latest_op = latest_income["operatingIncome"]
-        latest_net = latest_income["netIncome"]
+        # FCF per revenue requires cashflow
+        df_cash = date_sorted(self.state.cashflow_df)
+        latest_cash = df_cash.iloc[-1]
+
+        # Operating, net and FCF margins in one division over the latest revenue
+        op_margin, net_margin, fcf_margin = np.array(
+            [latest_income["operatingIncome"], latest_income["netIncome"], latest_cash["freeCashFlow"]],
+            dtype=np.float64,
+        ) / latest_income["revenue"] * 100
 
         unit1, unit2, unit3 = st.columns(3)
 
         unit1.metric(
             "Operating Income per $ Revenue",
-            f"{(latest_op / latest_rev) * 100:.1f}%"
+            f"{op_margin:.1f}%"
         )
 
         unit2.metric(
             "Net Income per $ Revenue",
-            f"{(latest_net / latest_rev) * 100:.1f}%"
+            f"{net_margin:.1f}%"
         )
 
-        # FCF per revenue requires cashflow
-        df_cash = pd.DataFrame(self.state.cashflow_df).sort_values("date")
-        latest_cash = df_cash.iloc[-1]
-        fcf_margin = latest_cash["freeCashFlow"] / latest_income["revenue"]
-
         unit3.metric(
             "Free Cash Flow per $ Revenue",
-            f"{fcf_margin * 100:.1f}%"
+            f"{fcf_margin:.1f}%"
         )
 
         st.write("---")
@@ -151,41 +180,16 @@ class ProfitEnginePage(BasePage):
         # -----------------------------
         st.write("### Profit Engine Insights")
 
-        insights = []
-
-        # Margin expansion/contraction
-        gm_now = latest_fin["grossProfitMargin"]
-        gm_prev = df_fin.iloc[-2]["grossProfitMargin"]
-
-        if gm_now > gm_prev:
-            insights.append("• Gross margin expanded year-over-year.")
-        else:
-            insights.append("• Gross margin declined year-over-year.")
-
-        # Operating leverage
-        op_margin_now = latest_fin["operatingProfitMargin"]
-        op_margin_prev = df_fin.iloc[-2]["operatingProfitMargin"]
-
-        if op_margin_now > op_margin_prev:
-            insights.append("• Operating margin improving — positive operating leverage.")
-        else:
-            insights.append("• Operating margin weakening — cost pressures increasing.")
-
-        # Efficiency improvement
-        inv_turn = latest_fin["inventoryTurnover"]
-        inv_prev = df_fin.iloc[-2]["inventoryTurnover"]
-        if inv_turn > inv_prev:
-            insights.append("• Inventory turnover improved — better working capital efficiency.")
+        # Year-over-year moves of the ratio columns in one comparison; the
+        # "down" message applies to any non-improvement (flat or NaN included)
+        fin_tail = df_fin[list(_TREND_COLS)].to_numpy()[-2:]
+        improved = fin_tail[1] > fin_tail[0]
+        insights = [up if better else down for (up, down), better in zip(_TREND_MESSAGES, improved) if better or down]
 
         # Revenue trend
-        rev_now = df_income.iloc[-1]["revenue"]
-        rev_prev = df_income.iloc[-2]["revenue"]
+        rev_prev, rev_now = df_income["revenue"].to_numpy()[-2:]
         rev_growth = (rev_now - rev_prev) / rev_prev
-
-        if rev_growth > 0.05:
-            insights.append("• Strong revenue acceleration (>5% YoY).")
-        elif rev_growth < 0:
-            insights.append("• Revenue contracted year-over-year.")
+        insights += [msg for msg in band_insights([rev_growth], [0.05], [0.0], _REVENUE_MESSAGES) if msg]
 
         # Display insights
         for item in insights:
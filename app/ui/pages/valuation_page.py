@@ -1,13 +1,174 @@
 """
 Valuation Page
 """
-from decimal import Decimal
+import json
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from app.ui.base_page import BasePage
+from app.ui.base_page import BasePage, page_cache_data, date_sorted
+
+
+# Multiples trend chart: (legend label, column), in legend order
+_MULTIPLE_MAP = (
+    ("P/E Ratio", "priceToEarningsRatio"),
+    ("P/S Ratio", "priceToSalesRatio"),
+    ("P/B Ratio", "priceToBookRatio"),
+    ("EV/EBITDA", "evToEBITDA"),
+    ("EV/OpCF", "evToOperatingCashFlowRatio"),
+    ("EV/FreeCashFlow", "enterpriseValueOverEBITDA"),
+)
+_MULTIPLE_LABELS = {col: label for label, col in _MULTIPLE_MAP}
+
+# Scorecard bands for P/E, EV/EBITDA, P/S and P/B: a multiple below the
+# first threshold earns the first points value, and so on (P/B has two bands)
+_SCORE_THRESHOLDS = np.array([
+    [15.0, 25.0, 35.0],
+    [10.0, 16.0, 22.0],
+    [3.0, 6.0, 10.0],
+    [3.0, 6.0, np.inf],
+])
+_SCORE_POINTS = np.array([
+    [90, 70, 50, 20],
+    [90, 70, 50, 20],
+    [90, 70, 50, 20],
+    [90, 70, 40, 40],
+])
+
+
+def _multiples_score(pe, ev_ebitda, ps, pb) -> int:
+    """Scorecard points for P/E, EV/EBITDA, P/S and P/B, banded in one lookup; missing values score 50."""
+    multiples = np.array([pe, ev_ebitda, ps, pb], dtype=np.float64)
+    band = (multiples[:, None] >= _SCORE_THRESHOLDS).sum(axis=1)
+    return int(np.where(np.isnan(multiples), 50, _SCORE_POINTS[np.arange(len(multiples)), band]).sum())
+
+
+_YIELD_LABELS = {"earnings_yield": "Earnings Yield", "fcf_yield": "FCF Yield"}
+
+
+@page_cache_data
+def _prepare_frames(data_version, _df_m: pd.DataFrame, _df_fm: pd.DataFrame, _df_is: pd.DataFrame) -> tuple:
+    """
+    (metrics, financials, income) sorted by date. Dates arrive parsed from
+    FinancialDataService.convert_to_dataframes. Cached per data version.
+    """
+    return tuple(date_sorted(df) for df in (_df_m, _df_fm, _df_is))
+
+
+@page_cache_data
+def _yield_frame(data_version, _df_m: pd.DataFrame, _df_fm: pd.DataFrame) -> pd.DataFrame:
+    """
+    Metrics frame with earnings_yield and fcf_yield columns added. Cached
+    per data version.
+    """
+    df_m, df_fm = _df_m, _df_fm
+    df_yield = df_m.copy()
+
+    # Financials values on the metrics dates (the two frames need not share rows)
+    if "date" in df_fm.columns:
+        fm_on_dates = df_fm.drop_duplicates("date", keep="last").set_index("date").reindex(df_yield["date"])
+    else:
+        fm_on_dates = pd.DataFrame(index=df_yield.index)
+
+    # Earnings Yield = 1 / PE, only where P/E is positive
+    pe_src = df_yield if "priceToEarningsRatio" in df_yield.columns else fm_on_dates
+    pe = pe_src.get("priceToEarningsRatio", pd.Series(np.nan, index=pe_src.index)).to_numpy(dtype=np.float64, na_value=np.nan)
+    df_yield["earnings_yield"] = np.divide(1.0, pe, out=np.full_like(pe, np.nan), where=pe > 0)
+
+    # FCF yield = freeCashFlowPerShare / price
+    if "freeCashFlowPerShare" in fm_on_dates.columns and "price" in fm_on_dates.columns:
+        df_yield["fcf_yield"] = (fm_on_dates["freeCashFlowPerShare"] / fm_on_dates["price"]).to_numpy()
+    else:
+        df_yield["fcf_yield"] = np.nan
+
+    return df_yield
+
+
+@page_cache_data
+def _build_figures(data_version, _df_m: pd.DataFrame, _df_fm: pd.DataFrame, _df_is: pd.DataFrame, _df_yield: pd.DataFrame) -> dict:
+    """
+    The page's charts as Plotly JSON keyed by name, None where the inputs
+    are missing. Cached per data version, so widget reruns skip figure
+    construction and serialization.
+    """
+    df_m, df_fm, df_is, df_yield = _df_m, _df_fm, _df_is, _df_yield
+    figs = {}
+
+    # Column lookups go against plain sets, built once
+    m_colset = frozenset(df_m.columns)
+    fm_colset = frozenset(df_fm.columns)
+
+    # One long frame (each column keeps its own frame's dates), one px.line
+    m_cols = [col for _, col in _MULTIPLE_MAP if col in m_colset]
+    fm_cols = [col for _, col in _MULTIPLE_MAP if col not in m_colset and col in fm_colset]
+    mult_long = pd.concat(
+        [df.melt(id_vars="date", value_vars=cols) for df, cols in ((df_m, m_cols), (df_fm, fm_cols)) if cols]
+        or [pd.DataFrame(columns=["date", "variable", "value"])],
+        ignore_index=True,
+    ).dropna(subset=["value"])
+    mult_long["variable"] = mult_long["variable"].map(_MULTIPLE_LABELS)
+
+    fig_mult = px.line(
+        mult_long,
+        x="date",
+        y="value",
+        color="variable",
+        markers=True,
+        render_mode="webgl",
+        category_orders={"variable": [label for label, col in _MULTIPLE_MAP if col in m_colset or col in fm_colset]},
+    )
+    fig_mult.update_layout(
+        title="Valuation Multiples Over Time",
+        yaxis_title="Multiple",
+        legend_title_text=None,
+    )
+    figs["multiples"] = fig_mult
+
+    # EV / market cap the metrics frame lacks, joined from financials by date
+    df_val = df_m
+    missing = [c for c in ("enterpriseValue", "marketCap") if c not in m_colset and c in fm_colset]
+    if missing and "date" in fm_colset:
+        df_val = df_val.merge(
+            df_fm[["date", *missing]].drop_duplicates("date", keep="last"), on="date", how="left"
+        )
+
+    if "marketCap" in df_val.columns and "enterpriseValue" in df_val.columns:
+        fig_ev = go.Figure()
+        fig_ev.add_trace(go.Scattergl(x=df_val["date"], y=df_val["marketCap"], mode="lines", name="Market Cap"))
+        fig_ev.add_trace(go.Scattergl(x=df_val["date"], y=df_val["enterpriseValue"], mode="lines", name="Enterprise Value"))
+        fig_ev.update_layout(
+            title="EV vs Market Cap Over Time",
+            yaxis_title="USD"
+        )
+        figs["ev"] = fig_ev
+    else:
+        figs["ev"] = None
+
+    yield_long = df_yield.rename(columns=_YIELD_LABELS).melt(id_vars="date", value_vars=list(_YIELD_LABELS.values()))
+    fig_yield = px.line(yield_long, x="date", y="value", color="variable", markers=True, render_mode="webgl")
+    fig_yield.update_layout(title="Earnings & FCF Yields", yaxis_title="Yield", legend_title_text=None)
+    figs["yield"] = fig_yield
+
+    # Actual price vs the price implied by the average P/E
+    if "priceToEarningsRatio" in df_yield.columns and "price" in df_yield.columns:
+        avg_pe = float(df_yield["priceToEarningsRatio"].mean())
+        # EPS on the yield frame's dates, as a plain array
+        if "eps" in df_is.columns and "date" in df_is.columns:
+            eps = df_is.drop_duplicates("date", keep="last").set_index("date")["eps"].reindex(df_yield["date"])
+            eps = eps.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            eps = np.full(len(df_yield), np.nan)
+        dates = df_yield["date"].to_numpy()
+        fig_band = go.Figure()
+        fig_band.add_trace(go.Scattergl(x=dates, y=df_yield["price"].to_numpy(), mode="lines", name="Actual Price"))
+        fig_band.add_trace(go.Scattergl(x=dates, y=avg_pe * eps, mode="lines", name="Implied Price (Avg P/E)"))
+        fig_band.update_layout(title="Valuation Band: Price vs Implied Value")
+        figs["band"] = fig_band
+    else:
+        figs["band"] = None
+
+    return {name: fig.to_json() if fig is not None else None for name, fig in figs.items()}
 
 
 class ValuationPage(BasePage):
@@ -17,21 +178,20 @@ class ValuationPage(BasePage):
         # -------------------------
         # Load Data
         # -------------------------
-        df_m = pd.DataFrame(self.state.metrics_df.sort_values("date"))
-        df_fm = pd.DataFrame(self.state.financials_df.sort_values("date"))
-        df_is = self.state.income_statement_df.sort_values("date")
-
-        for df in (df_m, df_fm, df_is):
-            if "date" in df.columns:
-                df["date"] = pd.to_datetime(df["date"])
+        version = self.state.data_source
+        df_m, df_fm, df_is = _prepare_frames(
+            version, self.state.metrics_df, self.state.financials_df, self.state.income_statement_df
+        )
 
         if df_m.empty:
             st.warning("No 'metrics' data available for valuation analysis.")
             return
 
-        latest_m = df_m.iloc[-1]
-        latest_fm = df_fm.iloc[-1] if not df_fm.empty else pd.Series()
-        latest_is = df_is.iloc[-1]
+        latest_m = df_m.iloc[-1].to_dict()
+        latest_fm = df_fm.iloc[-1].to_dict() if not df_fm.empty else {}
+        latest_is = df_is.iloc[-1].to_dict()
+        # metrics values win over financials for the fields both frames carry
+        latest_any = latest_fm | latest_m
 
         # -------------------------
         # TOP KPI PANEL
@@ -42,18 +202,18 @@ class ValuationPage(BasePage):
 
         # Market Cap
         mc = latest_m.get("marketCap", np.nan)
-        k1.metric("Market Cap", f"${mc/Decimal(1e9):,.2f}B" if not pd.isna(mc) else "n/a")
+        k1.metric("Market Cap", f"${mc/ 1e9:,.2f}B" if not pd.isna(mc) else "n/a")
 
         # Enterprise Value
-        ev = latest_m.get("enterpriseValue", latest_fm.get("enterpriseValue", np.nan))
-        k2.metric("Enterprise Value", f"${ev/Decimal(1e9):,.2f}B" if not pd.isna(ev) else "n/a")
+        ev = latest_any.get("enterpriseValue", np.nan)
+        k2.metric("Enterprise Value", f"${ev/ 1e9:,.2f}B" if not pd.isna(ev) else "n/a")
 
         # P/E Ratio
-        pe = latest_m.get("priceToEarningsRatio", latest_fm.get("priceToEarningsRatio", np.nan))
+        pe = latest_any.get("priceToEarningsRatio", np.nan)
         k3.metric("P/E Ratio", f"{pe:.2f}" if not pd.isna(pe) else "n/a")
 
         # EV/EBITDA
-        ev_ebitda = latest_m.get("evToEBITDA", latest_fm.get("evToEBITDA", np.nan))
+        ev_ebitda = latest_any.get("evToEBITDA", np.nan)
         k4.metric("EV/EBITDA", f"{ev_ebitda:.2f}" if not pd.isna(ev_ebitda) else "n/a")
 
         st.write("---")
@@ -63,38 +223,10 @@ class ValuationPage(BasePage):
         # -------------------------
         st.subheader("Valuation Multiples — Multi-Year Trend")
 
-        multiple_map = {
-            "P/E Ratio": "priceToEarningsRatio",
-            "P/S Ratio": "priceToSalesRatio",
-            "P/B Ratio": "priceToBookRatio",
-            "EV/EBITDA": "evToEBITDA",
-            "EV/OpCF": "evToOperatingCashFlowRatio",
-            "EV/FreeCashFlow": "enterpriseValueOverEBITDA", 
-        }
-
-        fig_mult = go.Figure()
-
-        for label, col in multiple_map.items():
-            if col in df_m.columns:
-                s = df_m[["date", col]].dropna()
-            elif col in df_fm.columns:
-                s = df_fm[["date", col]].dropna()
-            else:
-                continue
-
-            if not s.empty:
-                fig_mult.add_trace(go.Scatter(
-                    x=s["date"],
-                    y=s[col],
-                    mode="lines+markers",
-                    name=label
-                ))
-
-        fig_mult.update_layout(
-            title="Valuation Multiples Over Time",
-            yaxis_title="Multiple"
-        )
-        st.plotly_chart(fig_mult, )
+        df_yield = _yield_frame(version, df_m, df_fm)
+        figs = _build_figures(version, df_m, df_fm, df_is, df_yield)
+
+        st.plotly_chart(json.loads(figs["multiples"]))
 
         st.write("---")
 
@@ -103,21 +235,8 @@ class ValuationPage(BasePage):
         # -------------------------
         st.subheader("Enterprise Value vs Market Cap")
 
-        df_val = df_m.copy()
-        if not df_fm.empty:
-            for col in ["enterpriseValue", "marketCap"]:
-                if col not in df_val.columns and col in df_fm.columns:
-                    df_val[col] = df_fm[col]
-
-        if "marketCap" in df_val.columns and "enterpriseValue" in df_val.columns:
-            fig_ev = go.Figure()
-            fig_ev.add_trace(go.Line(x=df_val["date"], y=df_val["marketCap"], name="Market Cap"))
-            fig_ev.add_trace(go.Line(x=df_val["date"], y=df_val["enterpriseValue"], name="Enterprise Value"))
-            fig_ev.update_layout(
-                title="EV vs Market Cap Over Time",
-                yaxis_title="USD"
-            )
-            st.plotly_chart(fig_ev, )
+        if figs["ev"] is not None:
+            st.plotly_chart(json.loads(figs["ev"]))
         else:
             st.info("Missing EV or Market Cap fields.")
 
@@ -128,30 +247,7 @@ class ValuationPage(BasePage):
         # -------------------------
         st.subheader("Earnings & Cash Flow Yields")
 
-        df_yield = df_m.copy()
-
-        # Earnings Yield = 1 / PE
-        df_yield["earnings_yield"] = np.where(
-            df_fm.get("priceToEarningsRatio", np.nan) > 0,
-            1 / df_fm.get("priceToEarningsRatio", np.nan),
-            np.nan
-        )
-
-        # FCF yield = freeCashFlowPerShare / price
-        if "freeCashFlowPerShare" in df_fm.columns and "price" in df_fm.columns:
-            df_yield["fcf_yield"] = df_fm["freeCashFlowPerShare"] / df_fm["price"]
-        else:
-            df_yield["fcf_yield"] = np.nan
-
-        fig_yield = go.Figure()
-        fig_yield.add_trace(go.Line(
-            x=df_yield["date"], y=df_yield["earnings_yield"], name="Earnings Yield"
-        ))
-        fig_yield.add_trace(go.Line(
-            x=df_yield["date"], y=df_yield["fcf_yield"], name="FCF Yield"
-        ))
-        fig_yield.update_layout(title="Earnings & FCF Yields", yaxis_title="Yield")
-        st.plotly_chart(fig_yield, )
+        st.plotly_chart(json.loads(figs["yield"]))
 
         st.write("---")
 
@@ -176,12 +272,7 @@ class ValuationPage(BasePage):
                     )
 
                     # Plot actual price vs implied band
-                    df_yield["implied_price"] = df_yield["priceToEarningsRatio"].mean() * df_is.get("eps", np.nan)
-                    fig_band = go.Figure()
-                    fig_band.add_trace(go.Line(x=df_yield["date"], y=df_yield["price"], name="Actual Price"))
-                    fig_band.add_trace(go.Line(x=df_yield["date"], y=df_yield["implied_price"], name="Implied Price (Avg P/E)"))
-                    fig_band.update_layout(title="Valuation Band: Price vs Implied Value")
-                    st.plotly_chart(fig_band, )
+                    st.plotly_chart(json.loads(figs["band"]))
                 else:
                     st.info("No EPS available for implied valuation.")
             else:
@@ -199,57 +290,9 @@ class ValuationPage(BasePage):
         score = 0
         max_score = 500
 
-        # P/E
-        if not pd.isna(pe):
-            if pe < 15:
-                score += 90
-            elif pe < 25:
-                score += 70
-            elif pe < 35:
-                score += 50
-            else:
-                score += 20
-        else:
-            score += 50
-
-        # EV/EBITDA
-        if not pd.isna(ev_ebitda):
-            if ev_ebitda < 10:
-                score += 90
-            elif ev_ebitda < 16:
-                score += 70
-            elif ev_ebitda < 22:
-                score += 50
-            else:
-                score += 20
-        else:
-            score += 50
-
-        # Price-to-Sales
         ps = latest_m.get("priceToSalesRatio", np.nan)
-        if not pd.isna(ps):
-            if ps < 3:
-                score += 90
-            elif ps < 6:
-                score += 70
-            elif ps < 10:
-                score += 50
-            else:
-                score += 20
-        else:
-            score += 50
-
-        # Price-to-Book
         pb = latest_m.get("priceToBookRatio", np.nan)
-        if not pd.isna(pb):
-            if pb < 3:
-                score += 90
-            elif pb < 6:
-                score += 70
-            else:
-                score += 40
-        else:
-            score += 50
+        score += _multiples_score(pe, ev_ebitda, ps, pb)
 
         # FCF Yield
         fcf_y = df_yield["fcf_yield"].iloc[-1]
@@ -2,20 +2,62 @@
 Main application file for the Streamlit app.
 """
 import streamlit as st
-from app.state.app_state import AppState
+from app.state.app_state import get_state
 from app.services.financial_data_service import FinancialDataService
 from app.repositories.financial_data_repository import FinancialDataRepository
 from app.ui.page_factory import PageFactory
 from app.config import settings
 import pandas as pd
-import json
+import plotly.io as pio
+import os
+import time
 
 st.set_page_config(page_title="Financial Narrative & Visualizer", layout="wide")
 
+# Serialize figures with orjson (a requirement), which encodes ndarray traces natively
+pio.json.config.default_engine = "orjson"
+
+MOCK_DATA_PATH = "data/mock_data.json"
+
+@st.cache_resource
+def get_repository(api_key: str) -> FinancialDataRepository:
+    """
+    One repository (and its DynamoDB client) per process, shared across
+    reruns and sessions.
+    """
+    return FinancialDataRepository(table_name="FinancialStatements", api_key=api_key)
+
+@st.cache_resource
+def get_service(api_key: str) -> FinancialDataService:
+    """
+    Shared service instance, so pages cached per session stay bound to it
+    across reruns.
+    """
+    return FinancialDataService(get_repository(api_key))
+
+@st.cache_data(show_spinner=False)
+def load_demo_dataframes(_service: FinancialDataService, json_path: str, mtime: float):
+    """
+    Loads and converts the demo dataset. Cached on the file path and its
+    modification time, so reruns reuse the DataFrames until the file changes.
+    """
+    bs_models, is_models, cf_models, metrics_models, financials = _service.load_mock_data(json_path)
+    return _service.convert_to_dataframes(bs_models, is_models, cf_models, metrics_models, financials)
+
+@st.cache_data(ttl=settings.CACHE_TTL_SECONDS, show_spinner="Fetching financial statements...")
+def fetch_api_dataframes(_service: FinancialDataService, symbol: str):
+    """
+    Fetches and converts a symbol's statements. Cached per symbol for an
+    hour, so re-clicking Fetch Data does not repeat the repository/API round
+    trip. Also returns the fetch time, which changes whenever the cache
+    entry is refreshed.
+    """
+    bs, is_, cf, metrics, financials = _service.get_financial_statements(symbol)
+    return _service.convert_to_dataframes(bs, is_, cf, metrics, financials), time.time()
+
 def main():
-    state = AppState()
-    repository = FinancialDataRepository(table_name="FinancialStatements", api_key=settings.API_KEY)
-    service = FinancialDataService(repository)
+    state = get_state()
+    service = get_service(settings.API_KEY)
 
     st.title("Financial Narrative & Visualizer")
     st.markdown("This app builds a full narrative + visualization engine from income statement, balance sheet and cashflow data. Upload CSV/JSON/XLSX files (separate or merged), or use the embedded 5-year Apple data to get started.")
@@ -24,33 +66,39 @@ def main():
     upload_option = st.sidebar.radio("How will you provide data?", options=['Use embedded example (AAPL demo)', 'API', 'Upload files (beta)'])
 
     if upload_option == 'API':
-        symbol_input = st.sidebar.selectbox("Select Stock Symbol:", options=settings.ALLOWED_SYMBOLS, index=settings.ALLOWED_SYMBOLS.index(state.symbol) if state.symbol in settings.ALLOWED_SYMBOLS else 0)
+        symbol_input = st.sidebar.selectbox("Select Stock Symbol:", options=settings.ALLOWED_SYMBOLS, index=settings.SYMBOL_INDEX.get(state.symbol, 0))
         if st.sidebar.button("Fetch Data"):
             if symbol_input:
-                bs, is_, cf, metrics, financials = service.get_financial_statements(symbol_input)
-                bs_df, is_df, cf_df, metrics_df, financials_df = service.convert_to_dataframes(bs, is_, cf, metrics, financials)
+                (bs_df, is_df, cf_df, metrics_df, financials_df), fetched_at = fetch_api_dataframes(service, symbol_input)
                 state.balance_sheet_df = bs_df
                 state.income_statement_df = is_df
                 state.cashflow_df = cf_df
                 state.metrics_df = metrics_df
                 state.financials_df = financials_df
                 state.symbol = symbol_input
+                # Page caches are keyed on data_source; a refreshed fetch is a new version
+                state.data_source = ("api", symbol_input, fetched_at)
     elif upload_option == 'Use embedded example (AAPL demo)':
-        with open("data/mock_data.json", "r") as f:
-            raw = json.load(f)
-        bs_models, is_models, cf_models, metrics_models, financials = service.load_mock_data("data/mock_data.json")
-        bs_df, is_df, cf_df, metrics_df, financials_df = service.convert_to_dataframes(bs_models, is_models, cf_models, metrics_models, financials)
-        print("COLONNNNNE", financials_df.columns)
-        state.balance_sheet_df = bs_df
-        state.income_statement_df = is_df
-        state.cashflow_df = cf_df
-        state.metrics_df = metrics_df
-        state.financials_df = financials_df
+        source_key = ("demo", MOCK_DATA_PATH, os.path.getmtime(MOCK_DATA_PATH))
+        # Reruns (tab switches, widget tweaks) keep the frames already in session
+        if state.data_source != source_key:
+            bs_df, is_df, cf_df, metrics_df, financials_df = load_demo_dataframes(service, MOCK_DATA_PATH, source_key[2])
+            state.balance_sheet_df = bs_df
+            state.income_statement_df = is_df
+            state.cashflow_df = cf_df
+            state.metrics_df = metrics_df
+            state.financials_df = financials_df
+            state.data_source = source_key
 
     if state.metrics_df is not None and not state.metrics_df.empty:
-        tabs = st.tabs(list(PageFactory.PAGES.keys()))
-        for i, tab_name in enumerate(PageFactory.PAGES.keys()):
-            with tabs[i]:
+        # Lazy tabs: switching tabs reruns the script and only the open tab's
+        # page is created and rendered
+        page_names = list(PageFactory.PAGES.keys())
+        tabs = st.tabs(page_names, key="page_tab", on_change="rerun")
+        for tab_name, tab in zip(page_names, tabs):
+            if not tab.open:
+                continue
+            with tab:
                 page = PageFactory.create_page(tab_name, state, service)
                 page.render()
 
@@ -0,0 +1,95 @@
+"""
+Unit tests for the shared page helpers in base_page.
+"""
+import numpy as np
+import pandas as pd
+from app.ui.base_page import band_insights, thin_series
+
+MESSAGES = [("high", "low")] * 4
+
+def test_band_insights_above_high():
+    """
+    Tests that values above high get the first message.
+    """
+    assert band_insights([0.3, 5.0], [0.2, 1.0], [0.0, 0.0], MESSAGES[:2]) == ["high", "high"]
+
+def test_band_insights_below_low():
+    """
+    Tests that values below low get the second message.
+    """
+    assert band_insights([-0.1, 0.5], [0.2, 1.0], [0.0, 0.6], MESSAGES[:2]) == ["low", "low"]
+
+def test_band_insights_in_band():
+    """
+    Tests that values inside the band, including exactly on either bound,
+    get None.
+    """
+    assert band_insights([0.1, 0.2, 0.0], [0.2, 0.2, 0.2], [0.0, 0.0, 0.0], MESSAGES[:3]) == [None, None, None]
+
+def test_band_insights_missing():
+    """
+    Tests that NaN and None values get None.
+    """
+    assert band_insights([np.nan, None], [0.2, 0.2], [0.0, 0.0], MESSAGES[:2]) == [None, None]
+
+def test_band_insights_per_rule_messages():
+    """
+    Tests that each value is judged against its own bounds and messages.
+    """
+    messages = [("rev up", "rev down"), ("margin up", "margin down"), ("fcf up", "fcf down")]
+    result = band_insights([0.06, -0.01, 0.5], [0.05, 0.0, 1.0], [0.0, 0.0, 0.0], messages)
+    assert result == ["rev up", "margin down", None]
+
+def test_thin_series_short_passthrough():
+    """
+    Tests that series at or under max_points come back unchanged, NaNs included.
+    """
+    x = np.arange(5)
+    y = np.array([1.0, np.nan, 3.0, 4.0, 5.0])
+    tx, ty = thin_series(x, y, max_points=5)
+    np.testing.assert_array_equal(tx, x)
+    np.testing.assert_array_equal(ty, y)
+
+def test_thin_series_drops_nans():
+    """
+    Tests that NaNs are dropped before thinning, and a series that fits
+    after dropping them is not thinned.
+    """
+    x = np.arange(10)
+    y = np.where(x % 2 == 0, x.astype("float64"), np.nan)
+    tx, ty = thin_series(x, y, max_points=6)
+    np.testing.assert_array_equal(tx, [0, 2, 4, 6, 8])
+    np.testing.assert_array_equal(ty, [0.0, 2.0, 4.0, 6.0, 8.0])
+
+    y[1] = 1.0
+    y[3] = 3.0
+    tx, ty = thin_series(x, y, max_points=4)
+    assert len(ty) == 4
+    assert not np.isnan(ty).any()
+
+def test_thin_series_downsamples():
+    """
+    Tests that long series come back with exactly max_points points, keeping
+    the first and last ones, in strictly increasing x order.
+    """
+    x = np.arange(5000)
+    y = np.sin(x / 50.0) + (x == 2500) * 10.0
+    tx, ty = thin_series(x, y, max_points=100)
+    assert len(tx) == len(ty) == 100
+    assert tx[0] == 0 and tx[-1] == 4999
+    assert (np.diff(tx) > 0).all()
+    np.testing.assert_array_equal(ty, y[tx])
+    assert 2500 in tx  # the spike survives
+
+def test_thin_series_datetime_x():
+    """
+    Tests that datetime x values come back as the same datetimes.
+    """
+    dates = pd.date_range("2000-01-01", periods=2000, freq="D")
+    y = np.cos(np.arange(2000) / 30.0)
+    tx, ty = thin_series(pd.Series(dates), y, max_points=50)
+    assert tx.dtype == dates.to_numpy().dtype
+    assert len(tx) == 50
+    assert tx[0] == dates[0].to_datetime64() and tx[-1] == dates[-1].to_datetime64()
+    assert set(tx).issubset(set(dates.to_numpy()))
+    np.testing.assert_array_equal(ty, y[dates.get_indexer(tx)])
@@ -0,0 +1,121 @@
+"""
+Unit tests for the FinancialDataRepository.
+"""
+import time
+import pytest
+from app.repositories import financial_data_repository as repo_module
+from app.repositories.financial_data_repository import (
+    BATCH_GET_BASE_DELAY,
+    BATCH_GET_MAX_ATTEMPTS,
+    CACHE_SCHEMA_VERSION,
+    FinancialDataRepository,
+    _to_attributes,
+)
+
+TABLE = "FinancialStatements"
+
+@pytest.fixture
+def repository(mocker):
+    """
+    Provides a FinancialDataRepository over a mocked boto3 session, with API
+    fetches replaced by a stub that returns the endpoint name.
+    """
+    mocker.patch('app.repositories.financial_data_repository.boto3.session.Session')
+    repository = FinancialDataRepository(table_name=TABLE, api_key="test")
+    mocker.patch.object(repository, "_fetch_and_store", side_effect=lambda symbol, endpoint, *args: [endpoint])
+    return repository
+
+@pytest.fixture
+def sleep(mocker):
+    """
+    Replaces time.sleep in the repository module.
+    """
+    return mocker.patch.object(repo_module.time, "sleep")
+
+def cached_item(repository, endpoint, values, schema_version=CACHE_SCHEMA_VERSION, age_seconds=0):
+    """
+    A cache item as BatchGetItem returns it, holding values as a List[int] blob.
+    """
+    return _to_attributes({
+        "symbol": "AAPL",
+        "dataset": endpoint,
+        "updated_at_epoch": int(time.time()) - age_seconds,
+        "data": repository._encode(int, values),
+        "schema_version": schema_version,
+    })
+
+def key(endpoint):
+    """
+    The DynamoDB key of a dataset, as sent in RequestItems.
+    """
+    return _to_attributes({"symbol": "AAPL", "dataset": endpoint})
+
+def test_load_many_spec_order(repository, sleep):
+    """
+    Tests that fresh items are decoded, stale and missing ones are fetched,
+    and results come back in spec order.
+    """
+    stale_age = repository.max_age_seconds + 60
+    repository.dynamodb.batch_get_item.return_value = {"Responses": {TABLE: [
+        cached_item(repository, "c", [3]),
+        cached_item(repository, "b", [2], age_seconds=stale_age),
+        cached_item(repository, "a", [1]),
+    ]}}
+
+    result = repository.load_many("AAPL", [("a", int), ("b", int), ("c", int), ("d", int)])
+
+    assert result == [[1], ["b"], [3], ["d"]]
+    assert repository.dynamodb.batch_get_item.call_count == 1
+    fetched = sorted(call.args[1] for call in repository._fetch_and_store.call_args_list)
+    assert fetched == ["b", "d"]
+    sleep.assert_not_called()
+
+def test_load_many_retries_unprocessed_keys(repository, sleep):
+    """
+    Tests that UnprocessedKeys are re-requested with exponential backoff.
+    """
+    repository.dynamodb.batch_get_item.side_effect = [
+        {"Responses": {TABLE: [cached_item(repository, "a", [1])]}, "UnprocessedKeys": {TABLE: {"Keys": [key("b")]}}},
+        {"Responses": {TABLE: []}, "UnprocessedKeys": {TABLE: {"Keys": [key("b")]}}},
+        {"Responses": {TABLE: [cached_item(repository, "b", [2])]}, "UnprocessedKeys": {}},
+    ]
+
+    result = repository.load_many("AAPL", [("a", int), ("b", int)])
+
+    assert result == [[1], [2]]
+    calls = repository.dynamodb.batch_get_item.call_args_list
+    assert len(calls) == 3
+    assert calls[1].kwargs["RequestItems"] == {TABLE: {"Keys": [key("b")]}}
+    assert [call.args[0] for call in sleep.call_args_list] == [BATCH_GET_BASE_DELAY, BATCH_GET_BASE_DELAY * 2]
+    repository._fetch_and_store.assert_not_called()
+
+def test_load_many_gives_up_after_max_attempts(repository, sleep):
+    """
+    Tests that keys still unprocessed after BATCH_GET_MAX_ATTEMPTS are
+    fetched from the API as cache misses.
+    """
+    repository.dynamodb.batch_get_item.return_value = {
+        "Responses": {TABLE: [cached_item(repository, "a", [1])]},
+        "UnprocessedKeys": {TABLE: {"Keys": [key("b")]}},
+    }
+
+    result = repository.load_many("AAPL", [("a", int), ("b", int)])
+
+    assert result == [[1], ["b"]]
+    assert repository.dynamodb.batch_get_item.call_count == BATCH_GET_MAX_ATTEMPTS
+    assert sleep.call_count == BATCH_GET_MAX_ATTEMPTS - 1
+    repository._fetch_and_store.assert_called_once()
+
+def test_load_many_refetches_other_schema_versions(repository, sleep):
+    """
+    Tests that fresh items written under another cache schema are refetched.
+    """
+    repository.dynamodb.batch_get_item.return_value = {"Responses": {TABLE: [
+        cached_item(repository, "a", [1], schema_version=CACHE_SCHEMA_VERSION - 1),
+        cached_item(repository, "b", [2]),
+    ]}}
+
+    result = repository.load_many("AAPL", [("a", int), ("b", int)])
+
+    assert result == [["a"], [2]]
+    repository._fetch_and_store.assert_called_once()
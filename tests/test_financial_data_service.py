@@ -7,7 +7,7 @@ from app.services.financial_data_service import FinancialDataService
 from app.repositories.financial_data_repository import FinancialDataRepository
 from decimal import Decimal
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def financial_data_service():
     """
     Provides a FinancialDataService instance for testing.
@@ -58,3 +58,50 @@ def test_compute_metrics(financial_data_service):
     assert result['payout_pct_of_FCF'][0] == (Decimal('-30') / Decimal('150'))
     assert result['current_ratio'][0] == Decimal('2.0')
     assert result['debt_to_equity'][0] == Decimal('0.6')
+    assert result['grossMargin'][0] == Decimal('0.4')
+    assert result['opMargin'][0] == Decimal('0.3')
+    assert result['netMargin'][0] == Decimal('0.1')
+    assert pd.isna(result['rev_yoy'][0])
+
+def test_compute_metrics_zero_denominators(financial_data_service):
+    """
+    Tests that ratios over a zero denominator come back as NaN for Decimal
+    statements instead of raising.
+    """
+    income_df = pd.DataFrame({
+        'fiscalYear': [2022, 2023],
+        'revenue': [Decimal('0'), Decimal('1000')],
+        'netIncome': [Decimal('0'), Decimal('100')],
+        'operatingCashFlow': [Decimal('10'), Decimal('200')],
+        'capitalExpenditure': [Decimal('5'), Decimal('50')],
+        'freeCashFlow': [Decimal('0'), Decimal('150')],
+        'grossProfit': [Decimal('0'), Decimal('400')],
+        'operatingIncome': [Decimal('0'), Decimal('300')],
+        'commonStockRepurchased': [Decimal('0'), Decimal('20')],
+        'commonDividendsPaid': [Decimal('0'), Decimal('10')],
+    })
+    balance_df = pd.DataFrame({
+        'fiscalYear': [2022, 2023],
+        'totalAssets': [Decimal('1000'), Decimal('1000')],
+        'totalLiabilities': [Decimal('500'), Decimal('500')],
+        'shortTermDebt': [Decimal('100'), Decimal('100')],
+        'longTermDebt': [Decimal('200'), Decimal('200')],
+        'cashAndCashEquivalents': [Decimal('50'), Decimal('50')],
+        'totalStockholdersEquity': [Decimal('0'), Decimal('500')],
+    })
+    cashflow_df = pd.DataFrame({
+        'fiscalYear': [2022, 2023],
+    })
+    metrics_df = pd.DataFrame({
+        'fiscalYear': [2022, 2023],
+    })
+
+    result = financial_data_service.compute_metrics(income_df, balance_df, cashflow_df, metrics_df)
+
+    assert pd.isna(result['grossMargin'][0])
+    assert pd.isna(result['OCF_to_NetIncome'][0])
+    assert pd.isna(result['payout_pct_of_FCF'][0])
+    assert pd.isna(result['debt_to_equity'][0])
+    assert pd.isna(result['rev_yoy'][1])
+    assert result['current_ratio'][0] == Decimal('2')
+    assert result['grossMargin'][1] == Decimal('0.4')
@@ -0,0 +1,110 @@
+"""
+Unit tests for the FinancialStrengthPage scorecard.
+"""
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from app.ui.pages.financial_strength_page import (
+    _band_score,
+    _scorecard,
+    _LR_BANDS,
+    _ND_BANDS,
+    _IC_BANDS,
+    _OCF_BANDS,
+    _CCC_BANDS,
+)
+
+# The original if/elif ladders, per component; missing values score 50.
+def liquidity_ladder(lr):
+    if lr >= 1.5:
+        return 90
+    elif lr >= 1.0:
+        return 70
+    elif lr >= 0.8:
+        return 50
+    return 20
+
+def leverage_ladder(nd_to_ebitda):
+    if nd_to_ebitda < 1:
+        return 90
+    elif nd_to_ebitda < 2:
+        return 70
+    elif nd_to_ebitda < 3:
+        return 50
+    return 20
+
+def coverage_ladder(ic):
+    if ic >= 10:
+        return 90
+    elif ic >= 4:
+        return 70
+    elif ic >= 2:
+        return 50
+    return 20
+
+def cash_generation_ladder(ocf_debt):
+    if ocf_debt > 0.5:
+        return 90
+    elif ocf_debt > 0.2:
+        return 70
+    elif ocf_debt > 0.1:
+        return 50
+    return 30
+
+def working_capital_ladder(ccc_val):
+    if ccc_val < 0:
+        return 90
+    elif ccc_val < 30:
+        return 70
+    elif ccc_val < 60:
+        return 50
+    return 20
+
+BAND_LADDERS = [
+    (_LR_BANDS, liquidity_ladder),
+    (_ND_BANDS, leverage_ladder),
+    (_IC_BANDS, coverage_ladder),
+    (_OCF_BANDS, cash_generation_ladder),
+    (_CCC_BANDS, working_capital_ladder),
+]
+
+def boundary_values(thresholds):
+    """
+    Every threshold, the nearest floats either side of it, and ±inf.
+    """
+    values = [-math.inf, math.inf]
+    for t in thresholds:
+        values += [math.nextafter(t, -math.inf), float(t), math.nextafter(t, math.inf)]
+    return values
+
+@pytest.mark.parametrize("bands, ladder", BAND_LADDERS, ids=["liquidity", "leverage", "coverage", "cash", "ccc"])
+def test_band_score_matches_ladder(bands, ladder):
+    """
+    Tests that each threshold table scores like the original ladder at and
+    around every boundary.
+    """
+    for value in boundary_values(bands[0]):
+        assert _band_score(value, bands) == ladder(value), value
+
+@pytest.mark.parametrize("bands, ladder", BAND_LADDERS, ids=["liquidity", "leverage", "coverage", "cash", "ccc"])
+@pytest.mark.parametrize("value", [None, np.nan, pd.NA])
+def test_band_score_missing(bands, ladder, value):
+    """
+    Tests that missing values get the neutral score.
+    """
+    assert _band_score(value, bands) == 50
+
+def test_scorecard_zero_debt():
+    """
+    Tests that OCF / total debt with zero debt scores as missing.
+    """
+    scores = _scorecard(1.5, 1.0, 10.0, 100.0, 0.0, 0.0)
+
+    assert scores == {
+        "Liquidity": 90,
+        "Leverage": 70,
+        "Coverage": 90,
+        "Cash generation": 50,
+        "Working capital": 70,
+    }
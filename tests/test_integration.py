@@ -8,16 +8,23 @@ from app.repositories.financial_data_repository import FinancialDataRepository
 from app.ui.page_factory import PageFactory
 from app.config import settings
 
-@pytest.fixture
-def app_dependencies(mocker):
+@pytest.fixture(scope="session")
+def service(session_mocker):
     """
-    Provides the application dependencies for testing.
+    Provides one FinancialDataService, over a mocked boto3 session, for the
+    whole test session.
     """
-    mocker.patch('boto3.resource')
-    state = AppState()
+    session_mocker.patch('app.repositories.financial_data_repository.boto3.session.Session')
     repository = FinancialDataRepository(table_name="FinancialStatements", api_key=settings.API_KEY)
-    service = FinancialDataService(repository)
-    return state, service
+    return FinancialDataService(repository)
+
+@pytest.fixture
+def app_dependencies(service):
+    """
+    Provides the application dependencies for testing: a fresh state per test
+    and the shared service.
+    """
+    return AppState(), service
 
 def test_page_factory(app_dependencies):
     """
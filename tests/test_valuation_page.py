@@ -0,0 +1,76 @@
+"""
+Unit tests for the ValuationPage scorecard.
+"""
+import math
+import numpy as np
+import pytest
+from app.ui.pages.valuation_page import _multiples_score
+
+# The original if/elif ladders for P/E, EV/EBITDA, P/S and P/B; missing values score 50.
+def pe_ladder(pe):
+    if pe < 15:
+        return 90
+    elif pe < 25:
+        return 70
+    elif pe < 35:
+        return 50
+    return 20
+
+def ev_ebitda_ladder(ev_ebitda):
+    if ev_ebitda < 10:
+        return 90
+    elif ev_ebitda < 16:
+        return 70
+    elif ev_ebitda < 22:
+        return 50
+    return 20
+
+def ps_ladder(ps):
+    if ps < 3:
+        return 90
+    elif ps < 6:
+        return 70
+    elif ps < 10:
+        return 50
+    return 20
+
+def pb_ladder(pb):
+    if pb < 3:
+        return 90
+    elif pb < 6:
+        return 70
+    return 40
+
+LADDERS = [
+    (0, pe_ladder, (15, 25, 35)),
+    (1, ev_ebitda_ladder, (10, 16, 22)),
+    (2, ps_ladder, (3, 6, 10)),
+    (3, pb_ladder, (3, 6)),
+]
+
+def boundary_values(thresholds):
+    """
+    Every threshold, the nearest floats either side of it, and ±inf.
+    """
+    values = [-math.inf, math.inf]
+    for t in thresholds:
+        values += [math.nextafter(t, -math.inf), float(t), math.nextafter(t, math.inf)]
+    return values
+
+@pytest.mark.parametrize("position, ladder, thresholds", LADDERS, ids=["pe", "ev_ebitda", "ps", "pb"])
+def test_multiples_score_matches_ladder(position, ladder, thresholds):
+    """
+    Tests that each multiple scores like the original ladder at and around
+    every boundary, with the other three missing.
+    """
+    for value in boundary_values(thresholds):
+        multiples = [np.nan] * 4
+        multiples[position] = value
+        assert _multiples_score(*multiples) == ladder(value) + 3 * 50, value
+
+def test_multiples_score_combined():
+    """
+    Tests the summed score for a full set of multiples.
+    """
+    assert _multiples_score(15, 9.9, 10, 6) == 70 + 90 + 20 + 40
+    assert _multiples_score(np.nan, None, np.nan, np.nan) == 4 * 50